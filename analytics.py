@@ -0,0 +1,151 @@
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, delete, func, case, and_, tuple_
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Food, Order, OrderItem, ShopDailyStat
+
+COUNTERS = ('orders', 'completed', 'cancelled', 'no_shows', 'units')
+MAX_DAYS = 366
+
+
+def _as_date(value):
+    # SQLite 的 date() 回傳字串，Postgres 回傳 date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _empty_bucket():
+    return dict.fromkeys(COUNTERS, 0) | {'by_category': {}}
+
+
+def compute_days(shop_id, start, end):
+    """Per-day buckets for pickups in ``[start, end)``, straight from the
+    order tables with two GROUP BY queries. Days without orders are included."""
+    day = func.date(Order.pickup_time)
+    in_range = (
+        Order.shop_id == shop_id,
+        Order.pickup_time >= datetime.combine(start, time.min),
+        Order.pickup_time < datetime.combine(end, time.min),
+    )
+    cancelled = Order.status == 'cancelled'
+    buckets = {start + timedelta(days=n): _empty_bucket() for n in range((end - start).days)}
+
+    order_rows = db.session.execute(
+        select(
+            day,
+            func.count(Order.id),
+            func.sum(case((Order.status == 'completed', 1), else_=0)),
+            func.sum(case((cancelled, 1), else_=0)),
+            func.sum(case((and_(cancelled, Order.cancelled_at >= Order.pickup_time), 1), else_=0)),
+        )
+        .where(*in_range)
+        .group_by(day)
+    )
+    for value, orders, completed, cancelled_count, no_shows in order_rows:
+        buckets[_as_date(value)].update(orders=orders, completed=int(completed or 0),
+                                        cancelled=int(cancelled_count or 0), no_shows=int(no_shows or 0))
+
+    # 只有已取貨的訂單算作實際送出的食物
+    unit_rows = db.session.execute(
+        select(day, func.coalesce(Food.category, ''), func.sum(OrderItem.quantity))
+        .join(Order, OrderItem.order_id == Order.id)
+        .join(Food, OrderItem.food_id == Food.id)
+        .where(*in_range, Order.status == 'completed')
+        .group_by(day, Food.category)
+    )
+    for value, category, units in unit_rows:
+        bucket = buckets[_as_date(value)]
+        bucket['by_category'][category] = bucket['by_category'].get(category, 0) + int(units)
+        bucket['units'] += int(units)
+    return buckets
+
+
+def _days_with_pending(shop_id, start, end):
+    day = func.date(Order.pickup_time)
+    rows = db.session.execute(
+        select(day).distinct()
+        .where(Order.shop_id == shop_id, Order.status == 'pending',
+               Order.pickup_time >= datetime.combine(start, time.min),
+               Order.pickup_time < datetime.combine(end, time.min))
+    ).scalars()
+    return {_as_date(value) for value in rows}
+
+
+def forget_days(orders):
+    """Drop the cached statistics of the days ``(shop_id, pickup_time)``
+    orders fall on, after their status changed. The caller commits."""
+    keys = {(shop_id, pickup_time.date()) for shop_id, pickup_time in orders}
+    if keys:
+        db.session.execute(delete(ShopDailyStat).where(tuple_(ShopDailyStat.shop_id, ShopDailyStat.day).in_(keys)))
+
+
+def _runs(days):
+    """``[start, end)`` ranges of consecutive dates in the sorted ``days``."""
+    runs = []
+    for day in days:
+        if runs and runs[-1][1] == day:
+            runs[-1][1] = day + timedelta(days=1)
+        else:
+            runs.append([day, day + timedelta(days=1)])
+    return [tuple(run) for run in runs]
+
+
+def _cached_days(shop_id, start, end):
+    """Buckets for settled days, computing the missing ones and storing
+    those without pending orders."""
+    cached = {
+        row.day: {name: getattr(row, name) for name in COUNTERS} | {'by_category': dict(row.by_category)}
+        for row in ShopDailyStat.query.filter(ShopDailyStat.shop_id == shop_id,
+                                              ShopDailyStat.day >= start, ShopDailyStat.day < end)
+    }
+    missing = [start + timedelta(days=n) for n in range((end - start).days)
+               if start + timedelta(days=n) not in cached]
+    if not missing:
+        return cached
+    # 只計算缺少的連續區段，已快取的日期不重算
+    fresh, pending = {}, set()
+    for run_start, run_end in _runs(missing):
+        fresh.update(compute_days(shop_id, run_start, run_end))
+        # 還有待取貨訂單的日期之後仍會變動，不寫入快取
+        pending |= _days_with_pending(shop_id, run_start, run_end)
+    rows = [{'shop_id': shop_id, 'day': day, **fresh[day]} for day in missing if day not in pending]
+    try:
+        if rows:
+            db.session.execute(ShopDailyStat.__table__.insert(), rows)
+            db.session.commit()
+    except IntegrityError:
+        # 另一個請求已寫入同樣的日期；這次直接使用算好的結果
+        db.session.rollback()
+    for day in missing:
+        cached[day] = fresh[day]
+    return cached
+
+
+def shop_analytics(shop_id, start, end, settled_before=None):
+    """Daily and per-category pickup statistics for ``[start, end)``.
+
+    Days before ``settled_before`` (default: yesterday) without pending
+    orders are treated as closed: they come from ``shop_daily_stats`` and are
+    aggregated only the first time they are requested, until a status change
+    drops them again (``forget_days``). Other days are aggregated live.
+    """
+    settled_before = settled_before or date.today() - timedelta(days=1)
+    closed_end = max(start, min(end, settled_before))
+    days = _cached_days(shop_id, start, closed_end) if closed_end > start else {}
+    if end > closed_end:
+        days.update(compute_days(shop_id, closed_end, end))
+
+    totals = _empty_bucket()
+    for bucket in days.values():
+        for name in COUNTERS:
+            totals[name] += bucket[name]
+        for category, units in bucket['by_category'].items():
+            totals['by_category'][category] = totals['by_category'].get(category, 0) + units
+    resolved = totals['completed'] + totals['cancelled']
+    totals['completion_rate'] = round(totals['completed'] / resolved, 4) if resolved else None
+    totals['no_show_rate'] = round(totals['no_shows'] / resolved, 4) if resolved else None
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [{'day': day.isoformat(), **days[day]} for day in sorted(days)],
+        'totals': totals,
+    }
@@ -0,0 +1,133 @@
+"""Concurrent checkout throughput under each database engine profile.
+
+    python benchmarks/bench_engine.py --threads 8 --orders 800 --readers 2
+    python benchmarks/bench_engine.py --database-url postgresql://user:pw@localhost/bench
+
+Writer threads place one-item orders through inventory.place_order while
+reader threads page through the shop directory. Each profile gets a fresh
+SQLite file (or wipes the --database-url database), so never point it at
+real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from engine_profiles import PROFILES
+from extensions import db
+from inventory import place_order, ReservationConflict
+from models import User, Shop, Food
+from queries import shop_page
+
+
+def seed(shops, foods_per_shop, users):
+    db.drop_all()
+    db.create_all()
+    db.session.add_all(User(name=f'User {i}', email=f'user{i}@bench.test') for i in range(users))
+    db.session.add_all(Shop(name=f'Shop {i}', manager_email=f'shop{i}@bench.test') for i in range(shops))
+    db.session.flush()
+    shop_ids = [shop.id for shop in Shop.query.all()]
+    db.session.add_all(Food(shop_id=shop_id, name=f'Food {n}', quantity=10 ** 6, is_active=True)
+                       for shop_id in shop_ids for n in range(foods_per_shop))
+    db.session.commit()
+    user_ids = [user.id for user in User.query.all()]
+    foods = [(food.shop_id, food.id) for food in Food.query.all()]
+    return user_ids, foods
+
+
+def run_profile(profile, url, args):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'DB_PROFILE': profile, 'EXPIRY_SWEEP_INTERVAL': 0})
+    with app.app_context():
+        user_ids, foods = seed(args.shops, args.foods_per_shop, args.threads)
+
+    pickup = datetime.now() + timedelta(hours=1)
+    per_thread = args.orders // args.threads
+    latencies, conflicts, reads = [], [], []
+    lock = threading.Lock()
+    writing = threading.Event()
+    start = threading.Barrier(args.threads + args.readers + 1)
+
+    def writer(user_id, rng):
+        timings, failed = [], 0
+        with app.app_context():
+            start.wait()
+            for _ in range(per_thread):
+                shop_id, food_id = rng.choice(foods)
+                started = time.perf_counter()
+                try:
+                    place_order(user_id, shop_id, pickup, {str(food_id): 1}, attempts=10)
+                except ReservationConflict:
+                    failed += 1
+                timings.append(time.perf_counter() - started)
+            db.session.remove()
+        with lock:
+            latencies.extend(timings)
+            conflicts.append(failed)
+
+    def reader():
+        count = 0
+        with app.app_context():
+            start.wait()
+            while writing.is_set():
+                shop_page(limit=24)
+                db.session.rollback()
+                count += 1
+            db.session.remove()
+        with lock:
+            reads.append(count)
+
+    writing.set()
+    threads = [threading.Thread(target=writer, args=(user_id, random.Random(user_id))) for user_id in user_ids]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads + readers:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    writing.clear()
+    for thread in readers:
+        thread.join()
+    with app.app_context():
+        db.engine.dispose()
+
+    latencies.sort()
+    placed = len(latencies) - sum(conflicts)
+    return {
+        'orders_per_s': placed / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'conflicts': sum(conflicts),
+        'reads_per_s': sum(reads) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--threads', type=int, default=8, help='concurrent checkout threads')
+    parser.add_argument('--readers', type=int, default=2, help='threads paging the shop directory meanwhile')
+    parser.add_argument('--orders', type=int, default=800, help='orders placed in total')
+    parser.add_argument('--shops', type=int, default=20)
+    parser.add_argument('--foods-per-shop', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    for profile in args.profiles.split(','):
+        url = args.database_url or 'sqlite:///' + os.path.join(workdir, f'bench_engine_{profile}.db')
+        stats = run_profile(profile, url, args)
+        print(f'{profile:8} {stats["orders_per_s"]:8.1f} orders/s  p50 {stats["p50_ms"]:7.2f} ms  '
+              f'p99 {stats["p99_ms"]:8.2f} ms  {stats["conflicts"]:3} gave up  {stats["reads_per_s"]:8.1f} reads/s')
+
+
+if __name__ == '__main__':
+    main()
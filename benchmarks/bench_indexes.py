@@ -0,0 +1,153 @@
+"""Query plans and timings for the hot queries, before and after the
+composite indexes from migration 3c9f1e7a2b64 and the orders created_at
+index from 1ef025544ff1.
+
+    python benchmarks/bench_indexes.py                      # temporary SQLite file
+    python benchmarks/bench_indexes.py --database-url postgresql://user:pw@localhost/bench
+
+The target database is wiped and re-created, so never point it at real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select, func, text
+from extensions import db
+from models import Food, Order, OrderItem
+
+INDEX_NAMES = [
+    'ix_foods_shop_id_is_active_quantity',
+    'ix_orders_user_id_created_at',
+    'ix_orders_shop_id_created_at',
+    'ix_orders_created_at',
+    'ix_order_items_order_id',
+]
+
+
+def seed(engine, shops, users, foods_per_shop, orders, chunk=5000):
+    metadata = db.metadata
+    users_t, shops_t = metadata.tables['users'], metadata.tables['shops']
+    foods_t, orders_t, items_t = metadata.tables['foods'], metadata.tables['orders'], metadata.tables['order_items']
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    def insert(conn, table, rows):
+        for start in range(0, len(rows), chunk):
+            conn.execute(table.insert(), rows[start:start + chunk])
+
+    with engine.begin() as conn:
+        insert(conn, users_t, [
+            {'id': i, 'name': f'user{i}', 'email': f'user{i}@bench.test', 'role': 'user', 'created_at': now}
+            for i in range(1, users + 1)
+        ])
+        insert(conn, shops_t, [
+            {'id': i, 'name': f'shop{i}', 'manager_email': f'shop{i}@bench.test',
+             'latitude': 25.0 + rng.random() * 0.2, 'longitude': 121.4 + rng.random() * 0.2, 'created_at': now}
+            for i in range(1, shops + 1)
+        ])
+        food_rows = [
+            {'id': (s - 1) * foods_per_shop + f + 1, 'shop_id': s, 'name': f'food{f}',
+             'quantity': rng.randint(0, 20), 'is_active': rng.random() < 0.7, 'created_at': now}
+            for s in range(1, shops + 1) for f in range(foods_per_shop)
+        ]
+        insert(conn, foods_t, food_rows)
+        order_rows, item_rows = [], []
+        for order_id in range(1, orders + 1):
+            shop_id = rng.randint(1, shops)
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            order_rows.append({'id': order_id, 'user_id': rng.randint(1, users), 'shop_id': shop_id,
+                               'pickup_time': created + timedelta(hours=2), 'status': 'completed',
+                               'created_at': created})
+            for n in range(rng.randint(1, 3)):
+                item_rows.append({'order_id': order_id, 'food_id': (shop_id - 1) * foods_per_shop + n + 1,
+                                  'quantity': 1})
+        insert(conn, orders_t, order_rows)
+        insert(conn, items_t, item_rows)
+
+
+def hot_queries(shops, users, orders):
+    shop_id, user_id = shops // 2, users // 2
+    order_ids = list(range(orders // 2, orders // 2 + 20))
+    return [
+        ('shop detail foods', select(Food).where(Food.shop_id == shop_id, Food.is_active.is_(True))),
+        ('remaining quantity aggregate',
+         select(Food.shop_id, func.sum(Food.quantity)).where(Food.is_active.is_(True)).group_by(Food.shop_id)),
+        ('user orders', select(Order).where(Order.user_id == user_id).order_by(Order.created_at.desc())),
+        ('shop orders', select(Order).where(Order.shop_id == shop_id).order_by(Order.created_at.desc())),
+        ('latest orders', select(Order).order_by(Order.created_at.desc()).limit(20)),
+        ('order items', select(OrderItem).where(OrderItem.order_id.in_(order_ids))),
+    ]
+
+
+def explain(conn, sql):
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+        return [row[-1] for row in rows]
+    rows = conn.execute(text('EXPLAIN ' + sql)).fetchall()
+    return [row[0] for row in rows]
+
+
+def measure(engine, queries, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries:
+            sql = str(stmt.compile(engine, compile_kwargs={'literal_binds': True}))
+            plan = explain(conn, sql)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(text(sql)).fetchall()
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = (plan, timings[len(timings) // 2] * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--shops', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--foods-per-shop', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')
+    engine = create_engine(url)
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    with engine.begin() as conn:
+        for name in INDEX_NAMES:
+            indexes[name].drop(conn)
+
+    print(f'Seeding {engine.url.render_as_string()} ...')
+    seed(engine, args.shops, args.users, args.foods_per_shop, args.orders)
+    queries = hot_queries(args.shops, args.users, args.orders)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+    before = measure(engine, queries, args.repeat)
+
+    with engine.begin() as conn:
+        for name in INDEX_NAMES:
+            indexes[name].create(conn)
+        conn.execute(text('ANALYZE'))
+    after = measure(engine, queries, args.repeat)
+
+    for name, _ in queries:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        print(f'\n== {name}: {ms_before:.2f} ms -> {ms_after:.2f} ms (median of {args.repeat})')
+        print('   before: ' + ' | '.join(plan_before))
+        print('   after:  ' + ' | '.join(plan_after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Latency percentiles, SQL statement counts and rows fetched for the request
+hot paths at several data scales. Results are written as JSON so runs from
+different commits can be diffed.
+
+    python benchmarks/bench_requests.py --scales small,medium --output before.json
+    python benchmarks/bench_requests.py --scales small,medium --compare before.json
+
+Every scale wipes the database and regenerates it with seed.generate_data,
+so never point --database-url at real data.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--scales', default='small,medium', help='comma separated: ' + ', '.join(SCALES))
+    parser.add_argument('--requests', type=int, default=30, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='previous JSON results to compare against')
+    return parser.parse_args()
+
+
+SCALES = {
+    'small': dict(users=1000, shops=100, foods_per_shop=10, orders=10000),
+    'medium': dict(users=20000, shops=2000, foods_per_shop=10, orders=200000),
+    'large': dict(users=200000, shops=20000, foods_per_shop=10, orders=1000000),
+}
+ENDPOINTS = ['index', 'shop_detail', 'checkout', 'orders', 'shop_dashboard', 'admin_dashboard']
+
+
+class Recorder:
+    """Counts SQL statements sent to the engine and rows the ORM session
+    reads back while ``active`` is set."""
+
+    def __init__(self, db):
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        self.active = False
+        self.statements = 0
+        self.rows = 0
+        event.listen(db.engine, 'before_cursor_execute', self._statement)
+        event.listen(Session, 'do_orm_execute', self._execute)
+
+    def reset(self):
+        self.statements = 0
+        self.rows = 0
+
+    def _statement(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements += 1
+
+    def _execute(self, state):
+        if not self.active:
+            return None
+        result = state.invoke_statement()
+        if not getattr(result, 'returns_rows', True):
+            return result
+        # 先把結果全部讀出來計算列數，再交還給原本的呼叫者
+        frozen = result.freeze()
+        self.rows += len(frozen.data)
+        return frozen()
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def measure(recorder, count, warmup, prepare, send):
+    timings, statements, rows, statuses = [], [], [], set()
+    for n in range(warmup + count):
+        prepare()
+        recorder.reset()
+        recorder.active = True
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        recorder.active = False
+        statuses.add(response.status_code)
+        if n >= warmup:
+            timings.append(elapsed * 1000)
+            statements.append(recorder.statements)
+            rows.append(recorder.rows)
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p90_ms': round(percentile(timings, 0.9), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'statements': max(statements),
+        'rows_fetched': max(rows),
+        'status': sorted(statuses),
+    }
+
+
+def login(app, email, password):
+    client = app.test_client()
+    client.post('/login', data={'email': email, 'password': password})
+    return client
+
+
+def run_scale(app, db, recorder, name, size, args):
+    from seed import generate_data
+    from site_stats import refresh_stats
+    from geo import shop_index
+    from models import Shop, Food
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        rows = generate_data(db.engine, log=lambda line: None, **size)
+        refresh_stats()
+        # 結帳用的商家：無營業時間限制，並給一項食物充足庫存
+        shop = Shop.query.filter(Shop.closing_time.is_(None)).order_by(Shop.id).first()
+        food = Food.query.filter_by(shop_id=shop.id).order_by(Food.id).first()
+        food.is_active = True
+        food.quantity = 10 ** 6
+        db.session.commit()
+        shop_id, food_id, owner_index = shop.id, food.id, shop.id
+        load_seconds = time.perf_counter() - started
+    shop_index.invalidate()
+    app.extensions['fragment_cache'].clear()
+    print(f'[{name}] generated {sum(rows.values())} rows in {load_seconds:.1f}s')
+
+    anonymous = app.test_client()
+    customer = login(app, 'user1@example.com', 'password')
+    owner = login(app, f'shop{owner_index}@example.com', 'password')
+    admin = login(app, 'admin@example.com', 'admin123')
+    pickup_at = datetime.now() + timedelta(minutes=5)
+    pickup = pickup_at.strftime('%H:%M')
+    skip = set()
+    if pickup_at.date() != datetime.now().date():
+        print(f'[{name}] skipping checkout: pickup time would wrap past midnight')
+        skip.add('checkout')
+
+    def nothing():
+        pass
+
+    def fill_cart():
+        customer.post('/cart/add', data={'food_id': food_id, 'quantity': 1})
+
+    cases = {
+        'index': (nothing, lambda: anonymous.get('/')),
+        'shop_detail': (nothing, lambda: anonymous.get(f'/shops/{shop_id}')),
+        'checkout': (fill_cart, lambda: customer.post('/checkout', data={'pickup_time': pickup})),
+        'orders': (nothing, lambda: customer.get('/orders')),
+        'shop_dashboard': (nothing, lambda: owner.get('/shop/dashboard')),
+        'admin_dashboard': (nothing, lambda: admin.get('/admin')),
+    }
+    results = {}
+    for endpoint in ENDPOINTS:
+        if endpoint in skip:
+            continue
+        prepare, send = cases[endpoint]
+        results[endpoint] = measure(recorder, args.requests, args.warmup, prepare, send)
+        stats = results[endpoint]
+        print(f'[{name}] {endpoint:16} p50 {stats["p50_ms"]:9.2f} ms  p90 {stats["p90_ms"]:9.2f} ms  '
+              f'p99 {stats["p99_ms"]:9.2f} ms  {stats["statements"]:3} statements  {stats["rows_fetched"]:6} rows')
+    return {'rows': rows, 'endpoints': results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    print(f'\nCompared with {previous.get("revision")} ({previous.get("created_at")}):')
+    for scale, data in current['scales'].items():
+        before = previous.get('scales', {}).get(scale)
+        if not before:
+            continue
+        for endpoint, stats in data['endpoints'].items():
+            old = before['endpoints'].get(endpoint)
+            if not old:
+                continue
+            ratio = stats['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('inf')
+            flag = '  <-- slower' if ratio > 1.2 else ''
+            print(f'[{scale}] {endpoint:16} p50 {old["p50_ms"]:9.2f} -> {stats["p50_ms"]:9.2f} ms ({ratio:5.2f}x)  '
+                  f'statements {old["statements"]} -> {stats["statements"]}{flag}')
+
+
+def main():
+    args = parse_args()
+    url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_requests.db')
+    os.environ['DATABASE_URL'] = url
+
+    from app import create_app
+    from extensions import db
+    app = create_app()
+    with app.app_context():
+        recorder = Recorder(db)
+        dialect = db.engine.dialect.name
+
+    results = {
+        'revision': git_revision(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'database': dialect,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version if dialect == 'sqlite' else None,
+        'requests': args.requests,
+        'scales': {},
+    }
+    for name in args.scales.split(','):
+        results['scales'][name] = run_scale(app, db, recorder, name, SCALES[name], args)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        print(f'\nResults written to {args.output}')
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(json.load(handle), results)
+
+
+if __name__ == '__main__':
+    main()
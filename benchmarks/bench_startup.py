@@ -0,0 +1,98 @@
+"""Cold-start cost of a web worker: importing the app, create_app() and the
+first requests, each measured in a fresh interpreter.
+
+    python benchmarks/bench_startup.py --runs 10
+
+``cold`` starts every worker from scratch. ``preload`` imports and builds
+the app once, runs warm_up() (translation tables and templates, as
+gunicorn.conf.py does before forking) and then forks, so only the first
+requests are paid for in the worker. Needs os.fork, i.e. Linux or macOS.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PATHS = ['/login', '/']
+
+
+def first_requests(app):
+    client = app.test_client()
+    timings = {}
+    for path in PATHS:
+        started = time.perf_counter()
+        client.get(path)
+        timings[f'GET {path}'] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def child(mode):
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+    app = app_module.create_app()
+    created = time.perf_counter()
+    result = {'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000}
+    with app.app_context():
+        from extensions import db
+        db.create_all()
+    if mode == 'cold':
+        result.update(first_requests(app))
+        print(json.dumps(result))
+        return
+
+    warm_started = time.perf_counter()
+    app_module.warm_up(app)
+    result['preload_ms'] = (time.perf_counter() - warm_started) * 1000
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        with os.fdopen(write_end, 'w') as pipe:
+            pipe.write(json.dumps(first_requests(app)))
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        result.update(json.loads(pipe.read()))
+    os.waitpid(pid, 0)
+    print(json.dumps(result))
+
+
+def run(mode, runs, database_url):
+    samples = []
+    env = dict(os.environ, DATABASE_URL=database_url, EXPIRY_SWEEP_INTERVAL='0')
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, __file__, '--child', mode], env=env, cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample['process_ms'] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+    return {key: sorted(sample[key] for sample in samples)[len(samples) // 2] for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--modes', default='cold,preload')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_startup.db')
+    for mode in args.modes.split(','):
+        medians = run(mode, args.runs, database_url)
+        print(f'{mode} (median of {args.runs} processes)')
+        for key, value in medians.items():
+            print(f'  {key:16} {value:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Render index.html with many shops and compare the precompiled translation
+tables against the previous per-call lookup.
+
+    python benchmarks/bench_translations.py --shops 1000 --repeat 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_translations.db')
+
+from flask import render_template, session, g
+from app import create_app
+from extensions import db
+from models import Shop, Food
+from queries import shop_page, max_remaining_quantity
+from translations import translations
+
+
+def legacy_translate(key, **kwargs):
+    # 改版前的 translate()：每次呼叫都重新讀 session 並做兩次查表
+    lang = session.get('lang', 'en')
+    if lang not in translations:
+        lang = 'en'
+    default = translations.get('en', {})
+    lang_dict = translations.get(lang, {})
+    text = lang_dict.get(key, default.get(key, key))
+    if kwargs:
+        return text.format(**kwargs)
+    return text
+
+
+def seed(count):
+    db.create_all()
+    shops = [Shop(name=f'Shop {i}', manager_email=f'shop{i}@bench.test', address=f'{i} Bench Road',
+                  latitude=25.0 + i * 1e-4, longitude=121.5) for i in range(count)]
+    db.session.add_all(shops)
+    db.session.flush()
+    db.session.add_all(Food(shop_id=shop.id, name='Meal', quantity=i % 7, is_active=True)
+                       for i, shop in enumerate(shops))
+    db.session.commit()
+
+
+def timed_render(repeat, **context):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render_template('index.html', **context)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shops', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--lang', default='zh')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(args.shops)
+        with app.test_request_context('/'):
+            session['lang'] = args.lang
+            app.preprocess_request()
+            shops, _ = shop_page(limit=args.shops)
+            context = dict(shops=shops, next_url=None, sort='supply', max_quantity=max_remaining_quantity())
+
+            compiled_ms = timed_render(args.repeat, **context)
+            legacy_ms = timed_render(args.repeat, trans=legacy_translate, **context)
+
+            calls = []
+            render_template('index.html', trans=lambda key, **kw: calls.append(key) or legacy_translate(key, **kw),
+                            **context)
+
+            lookups = 100000
+            legacy_us = timeit.timeit(lambda: legacy_translate('label_remaining'), number=lookups) / lookups * 1e6
+            # 模板拿到的是已綁定的查詢表本身，不需經過 g
+            translator = g.translator
+            compiled_us = timeit.timeit(lambda: translator('label_remaining'), number=lookups) / lookups * 1e6
+
+    print(f'index.html with {args.shops} shops, {len(calls)} trans() calls per render ({args.lang})')
+    print(f'  legacy lookup:   {legacy_ms:8.2f} ms (median of {args.repeat})')
+    print(f'  compiled tables: {compiled_ms:8.2f} ms (median of {args.repeat})')
+    print(f'single lookup: legacy {legacy_us:.3f} us, compiled {compiled_us:.3f} us')
+
+
+if __name__ == '__main__':
+    main()
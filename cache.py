@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe in-process cache with bounded size and optional TTL.
+
+    The least recently used entry is evicted once ``maxsize`` is reached;
+    entries older than ``ttl`` seconds are treated as missing.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if self._expired(stored_at, time.monotonic()):
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def purge_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (stored_at, _) in self._data.items() if self._expired(stored_at, now)]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
@@ -0,0 +1,73 @@
+import copy
+from datetime import datetime, timedelta
+from cache import LRUCache
+from extensions import db
+from models import Cart
+
+
+class MemoryCartStore:
+    """Carts kept in this process only; fine for a single-worker deployment."""
+
+    def __init__(self, maxsize=10000, ttl=None):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, user_id):
+        # 回傳複本，避免呼叫端修改到快取中的物件
+        return copy.deepcopy(self._cache.get(user_id, {}))
+
+    def save(self, user_id, cart):
+        self._cache.set(user_id, copy.deepcopy(cart))
+
+    def delete(self, user_id):
+        self._cache.pop(user_id)
+
+    def purge_expired(self):
+        return self._cache.purge_expired()
+
+
+class SQLCartStore:
+    """Carts stored in the ``carts`` table, shared by every worker."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+
+    def _cutoff(self):
+        return datetime.utcnow() - timedelta(seconds=self.ttl) if self.ttl else None
+
+    def get(self, user_id):
+        cart = db.session.get(Cart, user_id)
+        cutoff = self._cutoff()
+        if cart is None or (cutoff and cart.updated_at < cutoff):
+            return {}
+        return dict(cart.data)
+
+    def save(self, user_id, cart):
+        row = db.session.get(Cart, user_id)
+        if row is None:
+            row = Cart(user_id=user_id)
+            db.session.add(row)
+        row.data = cart
+        row.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    def delete(self, user_id):
+        Cart.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+
+    def purge_expired(self):
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return 0
+        removed = Cart.query.filter(Cart.updated_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+
+def create_cart_store(config):
+    backend = config.get('CART_STORE', 'sql')
+    ttl = config.get('CART_TTL')
+    if backend == 'memory':
+        return MemoryCartStore(maxsize=config.get('CART_MEMORY_MAXSIZE', 10000), ttl=ttl)
+    if backend == 'sql':
+        return SQLCartStore(ttl=ttl)
+    raise ValueError(f'Unknown CART_STORE backend: {backend}')
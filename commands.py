@@ -0,0 +1,67 @@
+import json
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from extensions import db
+from sweeper import sweeper
+from site_stats import refresh_stats
+from food_io import iter_records, import_foods, inventory_csv, order_history_csv
+from views.common import import_format
+
+
+@click.command("purge-carts")
+@with_appcontext
+def purge_carts():
+    removed = current_app.extensions['cart_store'].purge_expired()
+    print(f"Removed {removed} abandoned carts.")
+
+# 取消逾期未取的訂單 (補回庫存) 並下架過期食物，適合交給 cron 定期執行
+@click.command("sweep-expired")
+@with_appcontext
+def sweep_expired():
+    stats = sweeper.run_for(current_app)
+    print(json.dumps(stats))
+
+# 從資料表重新計算後台總覽數字 (修正長時間累積的誤差)
+@click.command("refresh-stats")
+@with_appcontext
+def refresh_site_stats():
+    totals = refresh_stats()
+    db.session.commit()
+    print(json.dumps(totals))
+
+# 從 CSV / JSON lines 檔案批次匯入某家商家的食物 (含 id 的列只更新數量)
+@click.command("import-foods")
+@with_appcontext
+@click.argument('shop_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_foods_command(shop_id, path):
+    with open(path, 'rb') as stream:
+        result = import_foods(shop_id, iter_records(stream, import_format(path)),
+                              chunk_size=current_app.config['FOOD_IMPORT_CHUNK'])
+    db.session.commit()
+    print(json.dumps(result._asdict()))
+
+# 匯出某家商家的庫存 (或加上 --orders 匯出訂單紀錄) 為 CSV 到標準輸出
+@click.command("export-foods")
+@with_appcontext
+@click.argument('shop_id', type=int)
+@click.option('--orders', is_flag=True, help='Export order history instead of inventory.')
+def export_foods_command(shop_id, orders):
+    for line in (order_history_csv if orders else inventory_csv)(shop_id):
+        click.echo(line, nl=False)
+
+# 建立資料庫表格的 CLI 指令 (方便開發使用)
+@click.command("init-db")
+@with_appcontext
+def init_db():
+    db.create_all()
+    print("Database tables created.")
+
+
+COMMANDS = (purge_carts, sweep_expired, refresh_site_stats, import_foods_command, export_foods_command, init_db)
+
+
+def register_commands(app):
+    for command in COMMANDS:
+        app.cli.add_command(command)
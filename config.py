@@ -5,3 +5,72 @@ class Config:
     # 使用環境變數指定資料庫；若未設定，退回本機 SQLite 方便開發
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # 資料庫引擎設定檔：tuned (預設) 依下列參數調整連線池 / SQLite pragma；default 完全沿用 SQLAlchemy 預設值
+    DB_PROFILE = os.environ.get('DB_PROFILE') or 'tuned'
+    # PostgreSQL 連線池：常駐連線數、尖峰時可額外開的連線數、等待連線的上限與連線回收時間 (秒)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = 10
+    DB_POOL_RECYCLE = 1800
+    # 單一 SQL 的執行上限 (毫秒)；0 表示不限制
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS') or 15000)
+    # SQLite：WAL 讓讀取不必等寫入，synchronous=NORMAL 在 WAL 下仍不會損毀資料，只是斷電時可能遺失最後幾筆交易
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    # 唯讀副本的連線字串 (以逗號分隔)；首頁、商家頁、訂單與管理列表會從副本讀取
+    DATABASE_REPLICA_URLS = [url.strip() for url in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',')
+                             if url.strip()]
+    # 寫入後這段時間內 (秒)，同一個瀏覽器的請求都改讀主資料庫，確保看得到自己剛寫入的資料
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS') or 10)
+    # 首頁每次載入的商家數量
+    SHOP_PAGE_SIZE = 24
+    # 地圖空間索引重新從資料庫載入的間隔 (秒)，讓其他 worker 新增/刪除的商家也能出現
+    GEO_INDEX_TTL = int(os.environ.get('GEO_INDEX_TTL') or 300)
+    # 購物車存放位置：sql (carts 資料表，多個 worker 共用) 或 memory (單一行程 LRU)
+    CART_STORE = os.environ.get('CART_STORE') or 'sql'
+    # 超過這段時間 (秒) 未更新的購物車視為放棄
+    CART_TTL = int(os.environ.get('CART_TTL') or 2 * 24 * 3600)
+    CART_MEMORY_MAXSIZE = 10000
+    # 商家卡片/食物列表 HTML 片段快取的最大筆數
+    FRAGMENT_CACHE_SIZE = 2048
+    # 商家後台訂單佇列每頁筆數
+    ORDER_PAGE_SIZE = 20
+    # 批次匯入食物時每次寫入的筆數
+    FOOD_IMPORT_CHUNK = 500
+    # 登入者身分快照 (id、角色、名稱、商家 id) 的快取筆數與存活秒數；TTL 設為 0 表示每次請求都查資料庫
+    IDENTITY_CACHE_SIZE = 10000
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 60)
+    # 後台用戶/商家列表每頁筆數
+    ADMIN_PAGE_SIZE = 50
+    # 密碼雜湊 (werkzeug 格式，例如 scrypt 或 pbkdf2:sha256:1000000)；更改後舊雜湊會在使用者下次登入時自動升級
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    # 同時計算雜湊的執行緒數、可排隊等待的數量 (超過就回 503)、單次等待上限 (秒)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE') or 16)
+    PASSWORD_HASH_TIMEOUT = 10
+    # 登入嘗試的 token bucket：每分鐘補充的次數與最多可累積的次數，分別依 IP 與帳號計算
+    LOGIN_IP_PER_MINUTE = int(os.environ.get('LOGIN_IP_PER_MINUTE') or 30)
+    LOGIN_IP_BURST = 30
+    LOGIN_ACCOUNT_PER_MINUTE = int(os.environ.get('LOGIN_ACCOUNT_PER_MINUTE') or 5)
+    LOGIN_ACCOUNT_BURST = 10
+    # 前面有幾層可信任的反向代理 (nginx、負載平衡器)；設定後以 X-Forwarded-For 取得真正的用戶端 IP，
+    # 否則所有人共用代理的 IP，登入限流會一起被擋。沒有代理時必須維持 0，避免用戶端偽造標頭
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES') or 0)
+    # JSON API 的 Cache-Control max-age (秒)
+    API_CACHE_MAX_AGE = 30
+    # 逾期未取訂單與過期食物的清理：每批處理筆數、取貨時間過後的寬限 (分鐘)
+    EXPIRY_SWEEP_BATCH = int(os.environ.get('EXPIRY_SWEEP_BATCH') or 500)
+    NO_SHOW_GRACE_MINUTES = int(os.environ.get('NO_SHOW_GRACE_MINUTES') or 30)
+    # 行程內排程的間隔 (秒)；0 表示不啟用，改由 cron 執行 flask sweep-expired
+    EXPIRY_SWEEP_INTERVAL = int(os.environ.get('EXPIRY_SWEEP_INTERVAL') or 0)
+    # Flask-Migrate (連同 alembic) 只有 flask 指令需要；flask CLI 啟動時會設定 FLASK_RUN_FROM_CLI，web worker 不必載入
+    ENABLE_MIGRATE = os.environ.get('FLASK_RUN_FROM_CLI') == 'true'
+    # gunicorn 預先載入 (gunicorn.conf.py) 時設為 1：背景排程延到每個 worker fork 之後才啟動
+    DEFER_BACKGROUND_JOBS = os.environ.get('DEFER_BACKGROUND_JOBS') == '1'
+    # 請求層級的效能量測 (SQL 次數/時間、模板時間、Server-Timing 標頭、/admin/metrics)；預設關閉
+    INSTRUMENTATION = os.environ.get('INSTRUMENTATION') == '1'
+    # 每筆記錄列出最慢的幾個 SQL；同一 SQL 在一次請求中重複這麼多次就視為疑似 N+1
+    METRICS_SLOWEST = 3
+    N_PLUS_ONE_THRESHOLD = 5
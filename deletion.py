@@ -0,0 +1,55 @@
+from collections import Counter
+from sqlalchemy import delete, select, func, or_, tuple_
+from extensions import db
+from models import User, Shop, Food, Order, OrderItem, Cart, ShopDailyStat
+from site_stats import adjust_stats
+
+
+def _run(counts, table, statement):
+    counts[table] += db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+
+def _delete_shops(shop_ids, counts):
+    shop_orders = select(Order.id).where(Order.shop_id.in_(shop_ids))
+    shop_foods = select(Food.id).where(Food.shop_id.in_(shop_ids))
+    _run(counts, 'order_items', delete(OrderItem).where(
+        or_(OrderItem.order_id.in_(shop_orders), OrderItem.food_id.in_(shop_foods))))
+    _run(counts, 'orders', delete(Order).where(Order.shop_id.in_(shop_ids)))
+    _run(counts, 'foods', delete(Food).where(Food.shop_id.in_(shop_ids)))
+    _run(counts, 'shop_daily_stats', delete(ShopDailyStat).where(ShopDailyStat.shop_id.in_(shop_ids)))
+    _run(counts, 'shops', delete(Shop).where(Shop.id.in_(shop_ids)))
+
+
+def delete_shops(shop_ids):
+    """Delete shops with their foods, orders and order items.
+
+    ``shop_ids`` is a list of ids or a SELECT of ids. Everything happens in
+    a fixed number of set-based DELETE statements, however many rows are
+    involved. Returns a ``Counter`` of rows removed per table; the caller
+    commits.
+    """
+    counts = Counter()
+    _delete_shops(shop_ids, counts)
+    adjust_stats(total_orders=-counts['orders'], total_shops=-counts['shops'])
+    return counts
+
+
+def delete_user(user_id):
+    """Delete a user, their orders and cart, and any shop they own."""
+    counts = Counter()
+    role = db.session.execute(select(User.role).where(User.id == user_id)).scalar()
+    user_orders = select(Order.id).where(Order.user_id == user_id)
+    # 使用者的訂單分散在各商家；先刪掉這些日期的統計快取，下次讀取時重算
+    _run(counts, 'shop_daily_stats', delete(ShopDailyStat).where(
+        tuple_(ShopDailyStat.shop_id, ShopDailyStat.day).in_(
+            select(Order.shop_id, func.date(Order.pickup_time)).where(Order.user_id == user_id))))
+    _run(counts, 'order_items', delete(OrderItem).where(OrderItem.order_id.in_(user_orders)))
+    _run(counts, 'orders', delete(Order).where(Order.user_id == user_id))
+    _run(counts, 'carts', delete(Cart).where(Cart.user_id == user_id))
+    owned_shops = [shop_id for (shop_id,) in db.session.execute(select(Shop.id).where(Shop.owner_id == user_id))]
+    if owned_shops:
+        _delete_shops(owned_shops, counts)
+    _run(counts, 'users', delete(User).where(User.id == user_id))
+    adjust_stats(total_orders=-counts['orders'], total_shops=-counts['shops'],
+                 total_users=-counts['users'] if role == 'user' else 0)
+    return counts
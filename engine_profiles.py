@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+PROFILES = ('tuned', 'default')
+
+
+def engine_options(config, url=None):
+    """``create_engine()`` keyword arguments for ``url`` (the primary
+    database by default) under the configured ``DB_PROFILE``.
+
+    ``default`` leaves everything to SQLAlchemy. ``tuned`` sizes the pool,
+    pings and recycles connections and sets a statement timeout on
+    PostgreSQL; SQLite is tuned with pragmas instead (``install_pragmas``).
+    """
+    if config['DB_PROFILE'] != 'tuned':
+        return {}
+    url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'postgresql':
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+    if config['DB_STATEMENT_TIMEOUT_MS']:
+        # 由伺服器中止跑太久的查詢，避免單一慢查詢長時間佔住連線
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+
+def sqlite_pragmas(config):
+    if config['DB_PROFILE'] != 'tuned':
+        return []
+    return [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+
+def configure(app):
+    """Merge the profile into ``SQLALCHEMY_ENGINE_OPTIONS`` (options set
+    explicitly win). Call before ``db.init_app``."""
+    if app.config['DB_PROFILE'] not in PROFILES:
+        raise ValueError(f"DB_PROFILE must be one of {', '.join(PROFILES)}")
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options(app.config),
+                                               **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+
+def install_pragmas(app, db):
+    """Run the profile's pragmas on every new connection of the app's
+    SQLite engines. Call after ``db.init_app``."""
+    pragmas = sqlite_pragmas(app.config)
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = [engine for engine in db.engines.values() if engine.dialect.name == 'sqlite']
+    for engine in engines:
+        event.listen(engine, 'connect', lambda dbapi_connection, record: _run_pragmas(dbapi_connection, pragmas))
+
+
+def _run_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(pragma)
+    cursor.close()
@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_login import LoginManager
+from replicas import RoutingSession
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+login_manager = LoginManager()
+login_manager.login_view = 'public.login'
@@ -0,0 +1,227 @@
+import csv
+import io
+import itertools
+import json
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import select, insert, update, bindparam
+from extensions import db
+from models import User, Food, Order, OrderItem
+from inventory import bump_stock_version
+
+IMPORT_FORMATS = ('csv', 'json')
+# 每批寫入筆數；整個匯入仍是同一個交易
+IMPORT_CHUNK = 500
+MAX_REPORTED_ERRORS = 50
+
+ImportResult = namedtuple('ImportResult', 'created updated skipped errors')
+
+
+class RowError(ValueError):
+    """A record failed validation; ``code`` maps to ``import_error_<code>``."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def iter_records(stream, fmt):
+    """Yield ``(line, record)`` from a binary upload without reading it whole.
+
+    CSV needs a header row. JSON is read as JSON lines (one object per line);
+    a file starting with ``[`` is taken as a single array and parsed at once.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    first = text.readline()
+    if first.lstrip().startswith('['):
+        for number, record in enumerate(json.loads(first + text.read()), start=1):
+            yield number, record
+        return
+    for number, line in enumerate(itertools.chain([first], text), start=1):
+        if line.strip():
+            yield number, _json_record(line)
+
+
+def _json_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _text(record, key, limit=None):
+    value = record.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if limit:
+        value = value[:limit]
+    return value or None
+
+
+def validate(record):
+    """Turn one raw record into ``('create', row)`` or ``('update', row)``."""
+    if not isinstance(record, dict):
+        raise RowError('format')
+    try:
+        quantity = int(str(record.get('quantity', '')).strip())
+    except ValueError:
+        raise RowError('quantity')
+    if quantity < 0:
+        raise RowError('quantity')
+    food_id = _text(record, 'id')
+    if food_id:
+        try:
+            return 'update', {'b_id': int(food_id), 'b_quantity': quantity}
+        except ValueError:
+            raise RowError('unknown_id')
+    name = _text(record, 'name', 100)
+    if not name:
+        raise RowError('name')
+    expiry = _text(record, 'expiry_time')
+    if expiry:
+        try:
+            expiry = datetime.fromisoformat(expiry)
+        except ValueError:
+            raise RowError('expiry')
+    return 'create', {
+        'name': name,
+        'category': _text(record, 'category', 50),
+        'quantity': quantity,
+        'expiry_time': expiry,
+        'description': _text(record, 'description'),
+        'photo_url': _text(record, 'photo_url', 255),
+        'is_active': True,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def import_foods(shop_id, records, chunk_size=IMPORT_CHUNK):
+    """Create new foods and update quantities of existing ones for a shop.
+
+    ``records`` is an iterable of ``(line, record)``. Records carrying an
+    ``id`` update that food's quantity (only foods of this shop); the rest
+    are inserted. Valid rows are written in executemany batches of
+    ``chunk_size`` as they stream in; invalid rows are skipped and the first
+    few reported as ``(line, code)``. The caller commits.
+    """
+    created = updated = skipped = 0
+    errors = []
+    inserts, updates = [], []
+
+    def error(line, code):
+        nonlocal skipped
+        skipped += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append((line, code))
+
+    def flush_inserts():
+        nonlocal created
+        if inserts:
+            db.session.execute(insert(Food), [dict(row, shop_id=shop_id) for row in inserts])
+            created += len(inserts)
+            inserts.clear()
+
+    def flush_updates():
+        nonlocal updated
+        if not updates:
+            return
+        owned = set(db.session.execute(
+            select(Food.id).where(Food.shop_id == shop_id, Food.id.in_([row['b_id'] for _, row in updates]))
+        ).scalars())
+        params = []
+        for line, row in updates:
+            if row['b_id'] in owned:
+                params.append(row)
+            else:
+                error(line, 'unknown_id')
+        if params:
+            db.session.connection().execute(
+                update(Food.__table__)
+                .where(Food.__table__.c.id == bindparam('b_id'), Food.__table__.c.shop_id == shop_id)
+                .values(quantity=bindparam('b_quantity')),
+                params,
+            )
+            updated += len(params)
+        updates.clear()
+
+    for line, record in records:
+        try:
+            action, row = validate(record)
+        except RowError as exc:
+            error(line, exc.code)
+            continue
+        if action == 'create':
+            inserts.append(row)
+            if len(inserts) >= chunk_size:
+                flush_inserts()
+        else:
+            updates.append((line, row))
+            if len(updates) >= chunk_size:
+                flush_updates()
+    flush_inserts()
+    flush_updates()
+    if created or updated:
+        bump_stock_version(shop_id)
+    return ImportResult(created, updated, skipped, errors)
+
+
+def _csv_lines(header, rows):
+    # 一次只格式化一列，大型匯出不需要把整個檔案放在記憶體
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in itertools.chain([header], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _isoformat(value):
+    return value.isoformat(sep=' ', timespec='minutes') if value else ''
+
+
+INVENTORY_COLUMNS = ['id', 'name', 'category', 'quantity', 'expiry_time', 'is_active', 'description', 'photo_url']
+ORDER_COLUMNS = ['order_id', 'pickup_time', 'status', 'customer', 'food_id', 'food', 'quantity',
+                 'created_at', 'completed_at', 'cancelled_at']
+
+
+def inventory_csv(shop_id, batch=1000):
+    """CSV lines of a shop's foods, fetched ``batch`` rows at a time. The
+    output can be edited and imported again to update quantities."""
+    rows = db.session.execute(
+        select(Food.id, Food.name, Food.category, Food.quantity, Food.expiry_time, Food.is_active,
+               Food.description, Food.photo_url)
+        .where(Food.shop_id == shop_id)
+        .order_by(Food.id)
+        .execution_options(yield_per=batch)
+    )
+    return _csv_lines(INVENTORY_COLUMNS, (
+        (row.id, row.name, row.category or '', row.quantity, _isoformat(row.expiry_time), int(bool(row.is_active)),
+         row.description or '', row.photo_url or '') for row in rows
+    ))
+
+
+def order_history_csv(shop_id, batch=1000):
+    """CSV lines of every order item a shop received, oldest order first."""
+    rows = db.session.execute(
+        select(Order.id, Order.pickup_time, Order.status, User.name, Food.id.label('food_id'),
+               Food.name.label('food_name'), OrderItem.quantity, Order.created_at, Order.completed_at,
+               Order.cancelled_at)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Food, OrderItem.food_id == Food.id)
+        .join(User, Order.user_id == User.id)
+        .where(Order.shop_id == shop_id)
+        .order_by(Order.id, OrderItem.id)
+        .execution_options(yield_per=batch)
+    )
+    return _csv_lines(ORDER_COLUMNS, (
+        (row.id, _isoformat(row.pickup_time), row.status, row.name, row.food_id, row.food_name, row.quantity,
+         _isoformat(row.created_at), _isoformat(row.completed_at), _isoformat(row.cancelled_at)) for row in rows
+    ))
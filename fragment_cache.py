@@ -0,0 +1,28 @@
+from markupsafe import Markup
+from cache import LRUCache
+
+
+class FragmentCache:
+    """Rendered HTML fragments keyed by ``(name, shop id, language, stock version, ...)``.
+
+    Entries are never invalidated explicitly: any stock change bumps
+    ``Shop.stock_version``, so the next lookup uses a new key and the stale
+    fragment simply ages out of the bounded LRU.
+    """
+
+    def __init__(self, maxsize=2048):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get_or_render(self, key, render):
+        html = self._cache.get(key)
+        if html is None:
+            html = Markup(render())
+            self._cache.set(key, html)
+        return html
+
+    def clear(self):
+        self._cache.clear()
+
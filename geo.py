@@ -0,0 +1,296 @@
+import heapq
+import math
+import threading
+import time
+from sqlalchemy import func
+from extensions import db
+from models import Shop, Food
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.195
+# 每格平均放幾家商家；格子大小依商家密度自動調整
+TARGET_PER_CELL = 8
+MIN_CELL_DEG = 0.0005
+MAX_CELL_DEG = 1.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def is_open(opening_time, closing_time, at):
+    # 未設定營業時間視為營業中；支援跨午夜 (例如 18:00 - 02:00)
+    if not opening_time or not closing_time:
+        return True
+    if opening_time <= closing_time:
+        return opening_time <= at <= closing_time
+    return at >= opening_time or at <= closing_time
+
+
+class GridIndex:
+    """Uniform lat/lng grid over shop coordinates.
+
+    Points live in square cells keyed by ``(floor(lat / cell), floor(lng / cell))``;
+    nearest-neighbour search walks rings of cells outward from the query cell.
+    """
+
+    def __init__(self, cell_deg=0.01):
+        self.cell_deg = cell_deg
+        self._cells = {}
+        self._points = {}
+        self._extent = None
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lng):
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def build(self, points):
+        points = list(points)
+        if points:
+            lats = [p[1] for p in points]
+            lngs = [p[2] for p in points]
+            area = max(max(lats) - min(lats), MIN_CELL_DEG) * max(max(lngs) - min(lngs), MIN_CELL_DEG)
+            cells_wanted = max(len(points) / TARGET_PER_CELL, 1)
+            self.cell_deg = min(max(math.sqrt(area / cells_wanted), MIN_CELL_DEG), MAX_CELL_DEG)
+        self._cells = {}
+        self._points = {}
+        self._extent = None
+        for point in points:
+            self.add(*point)
+
+    def add(self, point_id, lat, lng, payload=None):
+        self.remove(point_id)
+        cell = self._cell(lat, lng)
+        entry = (point_id, lat, lng, payload)
+        self._cells.setdefault(cell, []).append(entry)
+        self._points[point_id] = (cell, entry)
+        self._extent = None
+
+    def remove(self, point_id):
+        found = self._points.pop(point_id, None)
+        if not found:
+            return
+        cell, entry = found
+        bucket = self._cells.get(cell, [])
+        bucket.remove(entry)
+        if not bucket:
+            self._cells.pop(cell, None)
+        self._extent = None
+
+    def _cell_extent(self):
+        if self._extent is None:
+            rows = [c[0] for c in self._cells]
+            cols = [c[1] for c in self._cells]
+            self._extent = (min(rows), max(rows), min(cols), max(cols))
+        return self._extent
+
+    def _ring(self, cy, cx, radius):
+        if radius == 0:
+            yield (cy, cx)
+            return
+        for dx in range(-radius, radius + 1):
+            yield (cy - radius, cx + dx)
+            yield (cy + radius, cx + dx)
+        for dy in range(-radius + 1, radius):
+            yield (cy + dy, cx - radius)
+            yield (cy + dy, cx + radius)
+
+    def iter_nearest(self, lat, lng):
+        """Yield ``(distance_km, entry)`` in increasing distance."""
+        if not self._points:
+            return
+        cy, cx = self._cell(lat, lng)
+        low_y, high_y, low_x, high_x = self._cell_extent()
+        max_radius = max(abs(cy - low_y), abs(cy - high_y), abs(cx - low_x), abs(cx - high_x))
+        heap = []
+        radius = 0
+        while radius <= max_radius or heap:
+            if radius <= max_radius and 8 * radius > len(self._cells):
+                # 外圈的空格子比有資料的格子還多：剩下的直接全部掃過
+                for (y, x), bucket in self._cells.items():
+                    if max(abs(y - cy), abs(x - cx)) >= radius:
+                        for entry in bucket:
+                            heapq.heappush(heap, (haversine_km(lat, lng, entry[1], entry[2]), entry[0], entry))
+                radius = max_radius + 1
+                bound = math.inf
+            elif radius <= max_radius:
+                for cell in self._ring(cy, cx, radius):
+                    for entry in self._cells.get(cell, ()):
+                        heapq.heappush(heap, (haversine_km(lat, lng, entry[1], entry[2]), entry[0], entry))
+                # 尚未掃描的格子至少在這個距離之外 (經度方向依緯度縮短)
+                edge_lat = min(abs(lat) + (radius + 1) * self.cell_deg, 89.9)
+                bound = radius * self.cell_deg * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+                radius += 1
+            else:
+                bound = math.inf
+            while heap and heap[0][0] <= bound:
+                distance, _, entry = heapq.heappop(heap)
+                yield distance, entry
+
+    def within(self, south, west, north, east):
+        if not self._points:
+            return []
+        low_y, low_x = self._cell(south, west)
+        high_y, high_x = self._cell(north, east)
+        span = (high_y - low_y + 1) * (high_x - low_x + 1)
+        if span > len(self._cells):
+            buckets = self._cells.values()
+        else:
+            buckets = (self._cells.get((y, x), ()) for y in range(low_y, high_y + 1)
+                       for x in range(low_x, high_x + 1))
+        return [entry for bucket in buckets for entry in bucket
+                if south <= entry[1] <= north and west <= entry[2] <= east]
+
+
+class ShopIndex:
+    """Process-wide spatial index of shop coordinates.
+
+    Loaded lazily from the database and rebuilt after ``ttl`` seconds so that
+    shops registered or deleted by other worker processes eventually appear;
+    writes made in this process are applied immediately via ``add_shop`` and
+    ``remove_shop``. The lock only guards the in-memory grid: database
+    queries (reloads, stock checks) run without it.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._grid = GridIndex()
+        self._loaded_at = None
+        self._generation = 0
+        self._version = None
+        # 重新載入期間本行程的新增/刪除，換上新的格子前要補上
+        self._pending = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _fresh(self, version):
+        return (self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+                and (version is None or version == self._version))
+
+    def ensure_loaded(self, version=None):
+        """Load or rebuild the grid when it is older than ``ttl``, or when
+        ``version`` (e.g. the shop count and max id, read before calling)
+        differs from the one passed when it was last built."""
+        with self._lock:
+            if self._fresh(version):
+                return
+            # 版本不符時呼叫端需要新資料，要等重新載入完成
+            wait = self._loaded_at is None or version is not None
+        # 同一時間只有一個執行緒重新載入；只是過期時其他執行緒照常使用舊格子，不必排隊
+        if not self._load_lock.acquire(blocking=wait):
+            return
+        try:
+            with self._lock:
+                if self._fresh(version):
+                    return
+                generation = self._generation
+                self._pending = []
+            try:
+                rows = (
+                    db.session.query(Shop.id, Shop.latitude, Shop.longitude, Shop.opening_time, Shop.closing_time)
+                    .filter(Shop.latitude.isnot(None), Shop.longitude.isnot(None))
+                    .all()
+                )
+                grid = GridIndex()
+                grid.build((row.id, row.latitude, row.longitude, (row.opening_time, row.closing_time))
+                           for row in rows)
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                for change in self._pending:
+                    change(grid)
+                self._pending = None
+                self._grid = grid
+                if version is not None:
+                    self._version = version
+                # 載入期間被 invalidate 時，下次使用仍要重新載入
+                self._loaded_at = time.monotonic() if generation == self._generation else None
+        finally:
+            self._load_lock.release()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+            self._generation += 1
+
+    def _apply(self, change):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            if self._loaded_at is not None:
+                change(self._grid)
+
+    def add_shop(self, shop):
+        if shop.latitude is None or shop.longitude is None:
+            self.remove_shop(shop.id)
+            return
+        entry = (shop.id, shop.latitude, shop.longitude, (shop.opening_time, shop.closing_time))
+        self._apply(lambda grid: grid.add(*entry))
+
+    def remove_shop(self, shop_id):
+        self._apply(lambda grid: grid.remove(shop_id))
+
+    def _candidates(self, lat, lng, at, limit):
+        # 只在持有鎖時走訪格子，複製出前 limit 家符合營業時間的商家
+        found = []
+        with self._lock:
+            for distance, (shop_id, _, _, hours) in self._grid.iter_nearest(lat, lng):
+                if at is not None and not is_open(hours[0], hours[1], at):
+                    continue
+                found.append((shop_id, distance))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def nearest(self, lat, lng, k=5, at=None, require_stock=True):
+        """The ``k`` closest shops as ``(shop_id, distance_km)`` pairs.
+
+        ``at`` (a ``datetime.time``) keeps only shops open at that time;
+        ``require_stock`` keeps only shops with remaining active food, checked
+        against the database in small batches of candidates.
+        """
+        self.ensure_loaded()
+        if not require_stock:
+            return self._candidates(lat, lng, at, k)
+        found, checked, limit = [], set(), k * 2
+        while True:
+            candidates = self._candidates(lat, lng, at, limit)
+            batch = [candidate for candidate in candidates if candidate[0] not in checked]
+            for offset in range(0, len(batch), k * 2):
+                chunk = batch[offset:offset + k * 2]
+                checked.update(shop_id for shop_id, _ in chunk)
+                found.extend(_with_stock(chunk))
+                if len(found) >= k:
+                    break
+            # 候選不足 limit 代表格子已走完；否則擴大範圍再取下一批
+            if len(found) >= k or len(candidates) < limit:
+                return sorted(found, key=lambda pair: pair[1])[:k]
+            limit *= 2
+
+    def within(self, south, west, north, east):
+        self.ensure_loaded()
+        with self._lock:
+            return [entry[0] for entry in self._grid.within(south, west, north, east)]
+
+
+def _with_stock(candidates):
+    ids = [shop_id for shop_id, _ in candidates]
+    stocked = {
+        row.shop_id for row in
+        db.session.query(Food.shop_id)
+        .filter(Food.shop_id.in_(ids), Food.is_active.is_(True))
+        .group_by(Food.shop_id)
+        .having(func.sum(Food.quantity) > 0)
+    }
+    return [(shop_id, distance) for shop_id, distance in candidates if shop_id in stocked]
+
+
+shop_index = ShopIndex()
@@ -0,0 +1,32 @@
+import gc
+import multiprocessing
+import os
+
+# 預先載入 (preload)：app 在 master 建立一次，fork 出的 worker 以 copy-on-write 共用同一份程式碼與唯讀資料。
+# 背景排程的執行緒不會跟著 fork，改在每個 worker 啟動後才開始。
+os.environ.setdefault('DEFER_BACKGROUND_JOBS', '1')
+
+wsgi_app = 'wsgi:app'
+preload_app = True
+bind = os.environ.get('BIND') or '0.0.0.0:8000'
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count() * 2 + 1)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+
+
+def when_ready(server):
+    # fork 之前先編譯好翻譯表與模板，所有 worker 共用；再凍結 GC，避免 GC 改寫共用物件的標頭而複製分頁
+    from app import warm_up
+    from wsgi import app
+    warm_up(app)
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_background_jobs
+    from extensions import db
+    from wsgi import app
+    # 不沿用 master 在載入時可能開過的資料庫連線
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    start_background_jobs(app)
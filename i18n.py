@@ -0,0 +1,53 @@
+import string
+
+DEFAULT_LANG = 'en'
+
+
+class Translator:
+    """Flat lookup table for one language, with the English fallback merged in.
+
+    Strings containing ``{placeholders}`` keep a bound ``str.format`` so a call
+    with keyword arguments formats without re-checking the string; every
+    other string is returned as-is.
+    """
+
+    __slots__ = ('lang', 'strings', 'formatters')
+
+    def __init__(self, lang, strings):
+        self.lang = lang
+        self.strings = strings
+        self.formatters = {key: text.format for key, text in strings.items() if _has_fields(text)}
+
+    def __call__(self, key, **kwargs):
+        if kwargs:
+            formatter = self.formatters.get(key)
+            if formatter is not None:
+                return formatter(**kwargs)
+        return self.strings.get(key, key)
+
+
+def _has_fields(text):
+    return any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+
+
+def compile_translations(source):
+    default = source.get(DEFAULT_LANG, {})
+    return {lang: Translator(lang, {**default, **strings}) for lang, strings in source.items()}
+
+
+_translators = None
+
+
+def translators():
+    # 第一次使用時才載入並編譯全部語言，之後整個行程共用；
+    # gunicorn 預先載入時在 fork 前呼叫一次，各 worker 便共用同一份記憶體
+    global _translators
+    if _translators is None:
+        from translations import translations
+        _translators = compile_translations(translations)
+    return _translators
+
+
+def translator_for(lang):
+    compiled = translators()
+    return compiled.get(lang) or compiled[DEFAULT_LANG]
@@ -0,0 +1,80 @@
+from flask_login import UserMixin
+from sqlalchemy import select
+from cache import LRUCache
+from extensions import db
+from models import User, Shop
+
+
+class Identity(UserMixin):
+    """Lightweight stand-in for ``User`` handed to Flask-Login.
+
+    Holds only what the layout and permission checks need. Routes that
+    read or change other columns load the row with ``load_row()``.
+    """
+
+    def __init__(self, id, role, name, shop_id=None):
+        self.id = id
+        self.role = role
+        self.name = name
+        self.shop_id = shop_id
+
+    def load_row(self):
+        return db.session.get(User, self.id)
+
+    def __repr__(self):
+        return f'<Identity {self.id} {self.role}>'
+
+
+class IdentityCache:
+    """Bounded, short-TTL cache of ``Identity`` snapshots keyed by user id.
+
+    Most authenticated requests are answered without touching the users
+    table. Routes that change a user's name, role or shop call
+    ``invalidate``; changes made by other workers show up after ``ttl``
+    seconds. A ``ttl`` of 0 turns the cache off.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def init_app(self, app):
+        self._cache.maxsize = app.config['IDENTITY_CACHE_SIZE']
+        self._cache.ttl = app.config['IDENTITY_CACHE_TTL']
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def load(self, user_id):
+        identity = self._cache.get(user_id) if self._cache.ttl else None
+        if identity is None:
+            # 使用者與其商家 id 一次 JOIN 取回
+            row = db.session.execute(
+                select(User.id, User.role, User.name, Shop.id)
+                .outerjoin(Shop, Shop.owner_id == User.id)
+                .where(User.id == user_id)
+            ).first()
+            if row is None:
+                return None
+            identity = Identity(*row)
+            if self._cache.ttl:
+                self._cache.set(user_id, identity)
+        return identity
+
+    def remember(self, user):
+        """Snapshot a freshly loaded ``User`` row (for example at login)."""
+        identity = Identity(user.id, user.role, user.name, user.shop.id if user.shop else None)
+        if self._cache.ttl:
+            self._cache.set(user.id, identity)
+        return identity
+
+    def invalidate(self, *user_ids):
+        for user_id in user_ids:
+            if user_id is not None:
+                self._cache.pop(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,144 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, has_app_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 直方圖的上界 (毫秒)，最後一格收超過 2.5 秒的請求
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestMetrics:
+    """Per-request SQL, template and total timings, enabled by the
+    ``INSTRUMENTATION`` config flag.
+
+    Each instrumented response gets a ``Server-Timing`` header and one JSON
+    log line (query count, DB time, slowest statements, statements repeated
+    often enough to look like an N+1). Per-endpoint latency histograms are
+    kept in memory for ``/admin/metrics``. The hooks are only installed for
+    apps created with the flag on, and return immediately once it is turned
+    off.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def init_app(self, app):
+        # 引擎事件掛在 Engine 類別上，建立多個 app 時只需掛一次
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _current(self):
+        if not has_app_context():
+            return None
+        return g.get('_metrics')
+
+    def _start(self):
+        if current_app.config['INSTRUMENTATION']:
+            g._metrics = {'started': time.perf_counter(), 'queries': [], 'template': 0.0, 'renders': []}
+        else:
+            g.pop('_metrics', None)
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        if self._current() is not None:
+            conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        current = self._current()
+        if current is not None and conn.info.get('_metrics_started'):
+            current['queries'].append((statement, time.perf_counter() - conn.info['_metrics_started'].pop()))
+
+    def _before_render(self, sender, template, context, **extra):
+        current = self._current()
+        if current is not None:
+            current['renders'].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        current = self._current()
+        if current is not None and current['renders']:
+            started = current['renders'].pop()
+            # 巢狀的片段模板已包含在外層模板的時間內
+            if not current['renders']:
+                current['template'] += time.perf_counter() - started
+
+    def _finish(self, response):
+        current = g.pop('_metrics', None)
+        if current is None:
+            return response
+        total_ms = (time.perf_counter() - current['started']) * 1000
+        queries = current['queries']
+        db_ms = sum(duration for _, duration in queries) * 1000
+        template_ms = current['template'] * 1000
+        threshold = current_app.config['N_PLUS_ONE_THRESHOLD']
+        repeated = [{'sql': statement[:200], 'count': count}
+                    for statement, count in Counter(statement for statement, _ in queries).most_common()
+                    if count >= threshold]
+        slowest = sorted(queries, key=lambda query: query[1], reverse=True)[:current_app.config['METRICS_SLOWEST']]
+
+        response.headers['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{len(queries)} queries", tpl;dur={template_ms:.1f}, app;dur={total_ms:.1f}'
+        )
+        endpoint = request.endpoint or 'unknown'
+        record = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'queries': len(queries),
+            'template_ms': round(template_ms, 2),
+            'slowest': [{'ms': round(duration * 1000, 2), 'sql': statement[:200]} for statement, duration in slowest],
+            'n_plus_one': repeated,
+        }
+        logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record, ensure_ascii=False))
+        self._observe(endpoint, total_ms, len(queries), bool(repeated))
+        return response
+
+    def _observe(self, endpoint, total_ms, queries, suspicious):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'n_plus_one': 0,
+                'buckets': [0] * (len(BUCKETS_MS) + 1),
+            })
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['queries'] += queries
+            stats['n_plus_one'] += suspicious
+            stats['buckets'][next((i for i, bound in enumerate(BUCKETS_MS) if total_ms <= bound), len(BUCKETS_MS))] += 1
+
+    def snapshot(self):
+        """Per-endpoint request counts, mean/max latency, mean query count and
+        a latency histogram keyed by bucket upper bound in ms."""
+        labels = [f'le_{bound}' for bound in BUCKETS_MS] + ['inf']
+        with self._lock:
+            return {
+                endpoint: {
+                    'count': stats['count'],
+                    'mean_ms': round(stats['total_ms'] / stats['count'], 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'mean_queries': round(stats['queries'] / stats['count'], 2),
+                    'n_plus_one': stats['n_plus_one'],
+                    'histogram': dict(zip(labels, stats['buckets'])),
+                }
+                for endpoint, stats in sorted(self._endpoints.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+metrics = RequestMetrics()
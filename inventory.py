@@ -0,0 +1,144 @@
+import random
+import time
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from models import Shop, Food, Order, OrderItem
+from site_stats import adjust_stats
+from analytics import forget_days
+
+# 單筆品項的預約結果：要求數量與實際扣到的數量
+Fill = namedtuple('Fill', 'food_id requested booked')
+
+
+class ReservationConflict(Exception):
+    """Checkout kept colliding with concurrent writers and gave up."""
+
+
+def bump_stock_version(*shop_ids):
+    """Invalidate cached fragments of these shops (see ``fragment_cache``)."""
+    ids = {shop_id for shop_id in shop_ids if shop_id}
+    if ids:
+        db.session.execute(
+            update(Shop)
+            .where(Shop.id.in_(ids))
+            .values(stock_version=Shop.stock_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def reserve_stock(food_id, requested, shop_id=None):
+    """Take up to ``requested`` units of a food with a conditional UPDATE.
+
+    The decrement only applies while ``quantity`` still covers it, so two
+    concurrent checkouts can never push stock below zero or book the same
+    unit twice. If another transaction got there first the remaining stock
+    is re-read and a smaller amount is attempted. Returns the units booked.
+    """
+    conditions = [Food.id == food_id, Food.is_active.is_(True)]
+    if shop_id is not None:
+        conditions.append(Food.shop_id == shop_id)
+    while requested > 0:
+        available = db.session.execute(select(Food.quantity).where(*conditions)).scalar()
+        if not available or available <= 0:
+            return 0
+        take = min(available, requested)
+        result = db.session.execute(
+            update(Food)
+            .where(*conditions, Food.quantity >= take)
+            .values(quantity=Food.quantity - take)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return take
+    return 0
+
+
+def place_order(user_id, shop_id, pickup_time, items, attempts=3):
+    """Create an order for ``items`` (``{food_id: quantity}``) in one transaction.
+
+    Returns ``(order, fills)``; ``order`` is ``None`` when nothing could be
+    booked. Lock timeouts, deadlocks and serialization failures roll the
+    whole checkout back and retry with jittered backoff; after ``attempts``
+    failures ``ReservationConflict`` is raised.
+    """
+    for attempt in range(attempts):
+        try:
+            order = Order(user_id=user_id, shop_id=shop_id, pickup_time=pickup_time, status='pending')
+            db.session.add(order)
+            fills = []
+            for food_id, quantity in items.items():
+                booked = reserve_stock(int(food_id), int(quantity), shop_id=shop_id)
+                fills.append(Fill(int(food_id), int(quantity), booked))
+                if booked:
+                    db.session.add(OrderItem(order=order, food_id=int(food_id), quantity=booked))
+            if not any(fill.booked for fill in fills):
+                db.session.rollback()
+                return None, fills
+            bump_stock_version(shop_id)
+            adjust_stats(total_orders=1)
+            db.session.commit()
+            return order, fills
+        except OperationalError:
+            db.session.rollback()
+            time.sleep(0.05 * (2 ** attempt) * random.uniform(0.5, 1.5))
+    raise ReservationConflict()
+
+
+def cancel_orders(order_ids, include_completed=False):
+    """Cancel orders and put their items back on the shelf.
+
+    ``order_ids`` is a list of ids or a SELECT of ids, so a whole batch (for
+    example every no-show of a shop) is cancelled in one go. Orders are
+    claimed with a conditional UPDATE first, so an order cancelled twice
+    concurrently is only restocked once; the items of all claimed orders are
+    then added back with a single UPDATE and the cached statistics of their
+    pickup days are dropped. Returns the cancelled order ids; the caller
+    commits.
+    """
+    skip = ['cancelled'] if include_completed else ['cancelled', 'completed']
+    claim = (
+        update(Order)
+        .where(Order.id.in_(order_ids), Order.status.not_in(skip))
+        .values(status='cancelled', completed_at=None, cancelled_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.get_bind().dialect.update_returning:
+        claimed = db.session.execute(claim.returning(Order.id, Order.shop_id, Order.pickup_time)).all()
+    else:
+        candidates = db.session.execute(
+            select(Order.id, Order.shop_id, Order.pickup_time)
+            .where(Order.id.in_(order_ids), Order.status.not_in(skip))
+            .with_for_update()
+        ).all()
+        # 沒有 RETURNING 時 (例如 SQLite < 3.35，FOR UPDATE 也無效) 逐筆認領，
+        # 只有這次 UPDATE 真的改到的訂單才補回庫存
+        claimed = [row for row in candidates
+                   if db.session.execute(claim.where(Order.id == row.id)).rowcount == 1]
+    if not claimed:
+        return []
+    ids = [row.id for row in claimed]
+    returned = (
+        select(func.sum(OrderItem.quantity))
+        .where(OrderItem.food_id == Food.id, OrderItem.order_id.in_(ids))
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Food)
+        .where(Food.id.in_(select(OrderItem.food_id).where(OrderItem.order_id.in_(ids))))
+        .values(quantity=func.coalesce(Food.quantity, 0) + returned)
+        .execution_options(synchronize_session=False)
+    )
+    bump_stock_version(*{row.shop_id for row in claimed})
+    forget_days((row.shop_id, row.pickup_time) for row in claimed)
+    return ids
+
+
+def cancel_no_shows(shop_id, now=None):
+    """Cancel every pending order of a shop whose pickup time has passed."""
+    now = now or datetime.now()
+    return cancel_orders(
+        select(Order.id).where(Order.shop_id == shop_id, Order.status == 'pending', Order.pickup_time < now)
+    )
@@ -0,0 +1,40 @@
+"""add query pattern indexes
+
+Revision ID: 3c9f1e7a2b64
+Revises: 61debc41aaeb
+Create Date: 2026-10-18 10:12:45.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9f1e7a2b64'
+down_revision = '61debc41aaeb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('foods', schema=None) as batch_op:
+        batch_op.create_index('ix_foods_shop_id_is_active_quantity', ['shop_id', 'is_active', 'quantity'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_shop_id_created_at', ['shop_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_shop_id_created_at')
+        batch_op.drop_index('ix_orders_user_id_created_at')
+
+    with op.batch_alter_table('foods', schema=None) as batch_op:
+        batch_op.drop_index('ix_foods_shop_id_is_active_quantity')
@@ -1,7 +1,7 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from extensions import db
+from passwords import password_hasher
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -20,10 +20,13 @@ class User(UserMixin, db.Model):
     shop = db.relationship('Shop', backref='owner', uselist=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.name}>'
@@ -42,20 +45,36 @@ class Shop(db.Model):
     closing_time = db.Column(db.Time)
     rating = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 食物新增/修改/刪除或數量變動時遞增，作為頁面片段快取的版本號
+    stock_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # 關聯
     foods = db.relationship('Food', backref='shop', lazy='dynamic')
     orders = db.relationship('Order', backref='shop', lazy='dynamic')
 
+    # 由列表查詢 (queries.shop_listing) 一次帶入的剩餘數量，未帶入時為 None
+    remaining_quantity = db.query_expression()
+    # 依距離排序時由查詢填入 (公里)，非資料表欄位
+    distance_km = None
+
     def __repr__(self):
         return f'<Shop {self.name}>'
 
     @property
     def available_quantity(self):
-        return sum((food.quantity or 0) for food in self.foods.filter_by(is_active=True))
+        if self.remaining_quantity is not None:
+            return self.remaining_quantity
+        total = self.foods.filter_by(is_active=True).with_entities(db.func.sum(Food.quantity)).scalar()
+        return total or 0
 
 class Food(db.Model):
     __tablename__ = 'foods'
+    __table_args__ = (
+        # 商家頁面以 (shop_id, is_active) 篩選；帶上 quantity 讓剩餘數量統計只需掃索引
+        db.Index('ix_foods_shop_id_is_active_quantity', 'shop_id', 'is_active', 'quantity'),
+        # 過期食物清理依 expiry_time 範圍掃描
+        db.Index('ix_foods_is_active_expiry_time', 'is_active', 'expiry_time'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     shop_id = db.Column(db.Integer, db.ForeignKey('shops.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -72,6 +91,17 @@ class Food(db.Model):
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # 「我的訂單」與商家後台都依 created_at 由新到舊列出
+        db.Index('ix_orders_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_orders_shop_id_created_at', 'shop_id', 'created_at'),
+        # 後台「最新訂單」依 created_at 取前幾筆
+        db.Index('ix_orders_created_at', 'created_at'),
+        # 逾期未取訂單清理依 pickup_time 範圍掃描待取貨訂單
+        db.Index('ix_orders_status_pickup_time', 'status', 'pickup_time'),
+        # 商家後台的訂單佇列：依狀態篩選後按取貨時間排序
+        db.Index('ix_orders_shop_id_status_pickup_time', 'shop_id', 'status', 'pickup_time'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     shop_id = db.Column(db.Integer, db.ForeignKey('shops.id'), nullable=False)
@@ -80,9 +110,11 @@ class Order(db.Model):
     status = db.Column(db.String(20), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
+    # 取消時間；晚於取貨時間的取消視為未到取 (no-show)
+    cancelled_at = db.Column(db.DateTime)
 
-    # 關聯
-    items = db.relationship('OrderItem', backref='order', lazy='dynamic')
+    # 關聯 (非 dynamic，才能用 selectinload 一次載入所有訂單的品項)
+    items = db.relationship('OrderItem', backref='order')
 
     def __repr__(self):
         return f'<Order {self.id}>'
@@ -90,7 +122,7 @@ class Order(db.Model):
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     food_id = db.Column(db.Integer, db.ForeignKey('foods.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     
@@ -99,3 +131,39 @@ class OrderItem(db.Model):
 
     def __repr__(self):
         return f'<OrderItem {self.id}>'
+
+class Cart(db.Model):
+    __tablename__ = 'carts'
+    # 每位使用者一台購物車，內容為 {"shop_id": ..., "items": {"<food_id>": 數量}}
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    data = db.Column(db.JSON, nullable=False, default=dict)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<Cart {self.user_id}>'
+
+class ShopDailyStat(db.Model):
+    __tablename__ = 'shop_daily_stats'
+    # 已結算日期的商家統計快取 (見 analytics.py)；訂單狀態改變時刪除該日，下次讀取再重算
+    shop_id = db.Column(db.Integer, db.ForeignKey('shops.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    cancelled = db.Column(db.Integer, nullable=False, default=0)
+    no_shows = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    # {"分類": 已取貨數量}
+    by_category = db.Column(db.JSON, nullable=False, default=dict)
+
+    def __repr__(self):
+        return f'<ShopDailyStat {self.shop_id} {self.day}>'
+
+class SiteStat(db.Model):
+    __tablename__ = 'site_stats'
+    # 後台總覽數字；每個統計拆成數個 shard 列，並行寫入時不會搶同一列的鎖，讀取時加總
+    name = db.Column(db.String(50), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SiteStat {self.name}/{self.shard}>'
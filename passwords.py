@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashPoolBusy(Exception):
+    """Too many password hashes are already running or waiting."""
+
+
+class PasswordHasher:
+    """Runs werkzeug's deliberately slow password hashing on a small,
+    bounded thread pool.
+
+    At most ``workers`` hashes run at once and ``queue`` more may wait;
+    beyond that ``HashPoolBusy`` is raised straight away instead of letting
+    a burst of logins tie up every request worker on CPU. ``method`` is the
+    werkzeug hash method for new hashes; stored hashes made with another
+    method or cost report ``needs_rehash``.
+    """
+
+    def __init__(self, method='scrypt', workers=2, queue=16, timeout=10):
+        self.method = method
+        self.timeout = timeout
+        self._prefix = None
+        self._size = None
+        self._configure_pool(workers, queue)
+
+    def init_app(self, app):
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self._prefix = None
+        self._configure_pool(app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE'])
+
+    def _configure_pool(self, workers, queue):
+        # 每建立一個 app 都會呼叫；大小沒變就沿用原本的執行緒
+        if self._size == (workers, queue):
+            return
+        self._size = (workers, queue)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def _call(self, func, args):
+        # 在工作執行緒內歸還名額，呼叫端拿到結果時名額必定已釋出
+        try:
+            return func(*args)
+        finally:
+            self._slots.release()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashPoolBusy()
+        try:
+            future = self._executor.submit(self._call, func, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashPoolBusy() from None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was not made with the configured
+        method and cost (werkzeug stores both before the first ``$``)."""
+        if self._prefix is None:
+            # 設定可省略成本參數 (例如 "scrypt")，以 werkzeug 補上預設值後的完整前綴比較
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+
+password_hasher = PasswordHasher()
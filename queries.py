@@ -0,0 +1,193 @@
+import base64
+import binascii
+import json
+import math
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import with_expression, joinedload, selectinload
+from extensions import db
+from models import Shop, Food, Order, OrderItem
+
+SHOP_SORTS = ('supply', 'distance')
+ORDER_STATUSES = ('pending', 'completed', 'cancelled')
+ORDER_WINDOWS = ('today', 'upcoming', 'past', 'all')
+KM_PER_DEGREE = 111.195
+# 沒有座標的商家在距離排序中排在最後
+NO_LOCATION_KEY = 1.0e9
+
+
+def remaining_quantity_subquery():
+    # 每家商家上架中食物的剩餘總量，一次 GROUP BY 算完
+    return (
+        db.session.query(
+            Food.shop_id.label('shop_id'),
+            func.sum(Food.quantity).label('quantity')
+        )
+        .filter(Food.is_active.is_(True))
+        .group_by(Food.shop_id)
+        .subquery()
+    )
+
+
+def shop_listing():
+    """Shops with ``remaining_quantity`` preloaded from one aggregate query."""
+    stock = remaining_quantity_subquery()
+    remaining = func.coalesce(stock.c.quantity, 0)
+    return (
+        Shop.query
+        .outerjoin(stock, stock.c.shop_id == Shop.id)
+        .options(with_expression(Shop.remaining_quantity, remaining))
+        .order_by(Shop.id)
+    )
+
+
+def max_remaining_quantity():
+    stock = remaining_quantity_subquery()
+    return db.session.query(func.max(stock.c.quantity)).scalar() or 0
+
+
+def shops_fingerprint():
+    """``(count, max id, sum of stock versions)``: changes whenever any shop is
+    added or removed or any shop's stock changes. Used as a cheap ETag."""
+    return db.session.query(
+        func.count(Shop.id), func.coalesce(func.max(Shop.id), 0), func.coalesce(func.sum(Shop.stock_version), 0)
+    ).one()
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, key_type=float):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        key, last_id = json.loads(raw)
+        return key_type(key), int(last_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def distance_key(lat, lng):
+    # 等距圓柱近似：只用加減乘，SQLite 與 Postgres 都能算，且與實際距離同序
+    scale = math.cos(math.radians(lat))
+    dlat = Shop.latitude - lat
+    dlng = (Shop.longitude - lng) * scale
+    return func.coalesce(dlat * dlat + dlng * dlng, NO_LOCATION_KEY)
+
+
+def shop_page(sort='supply', lat=None, lng=None, cursor=None, limit=24):
+    """One keyset page of the shop directory.
+
+    ``supply`` orders by remaining quantity (descending), ``distance`` by
+    distance from ``lat``/``lng``; both break ties on shop id. Returns the
+    shops and the cursor for the following page (``None`` on the last page).
+    """
+    stock = remaining_quantity_subquery()
+    remaining = func.coalesce(stock.c.quantity, 0)
+    by_distance = sort == 'distance' and lat is not None and lng is not None
+    key = distance_key(lat, lng) if by_distance else remaining
+
+    query = (
+        db.session.query(Shop, key)
+        .outerjoin(stock, stock.c.shop_id == Shop.id)
+        .options(with_expression(Shop.remaining_quantity, remaining))
+    )
+    after = decode_cursor(cursor)
+    if after:
+        last_key, last_id = after
+        if by_distance:
+            query = query.filter(or_(key > last_key, and_(key == last_key, Shop.id > last_id)))
+        else:
+            query = query.filter(or_(key < last_key, and_(key == last_key, Shop.id > last_id)))
+    query = query.order_by(key.asc() if by_distance else key.desc(), Shop.id.asc())
+
+    rows = query.limit(limit + 1).all()
+    shops = []
+    for shop, value in rows[:limit]:
+        if by_distance and value < NO_LOCATION_KEY:
+            shop.distance_km = math.sqrt(value) * KM_PER_DEGREE
+        shops.append(shop)
+    next_cursor = None
+    if len(rows) > limit:
+        _, last_value = rows[limit - 1]
+        next_cursor = encode_cursor([last_value, shops[-1].id])
+    return shops, next_cursor
+
+
+def order_loader_options():
+    """Loader options for order lists that show shop, customer and items.
+
+    Shop and customer are joined into the order query and all items (with
+    their food) arrive in one extra SELECT ... IN, so a page costs the same
+    number of statements however many orders it lists.
+    """
+    return (
+        joinedload(Order.shop),
+        joinedload(Order.user),
+        selectinload(Order.items).joinedload(OrderItem.food),
+    )
+
+
+def admin_page(model, columns, search=None, after=None, limit=50):
+    """One page of ``model`` rows in id order for the admin tables.
+
+    ``search`` keeps rows where any of ``columns`` contains it
+    (case-insensitive); ``after`` is the last id of the previous page.
+    Returns the rows and the id to continue after (``None`` on the last page).
+    """
+    query = model.query
+    if search:
+        pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.filter(or_(*(column.ilike(pattern, escape='\\') for column in columns)))
+    if after:
+        query = query.filter(model.id > after)
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    return rows[:limit], (rows[limit - 1].id if len(rows) > limit else None)
+
+
+def order_queue(shop_id, status='pending', window='today', cursor=None, limit=20, today=None):
+    """One keyset page of a shop's orders, filtered by status and pickup window.
+
+    Orders come in pickup time order (newest first for ``past``) with ties
+    broken on id. With a single status this is a range scan on
+    ``ix_orders_shop_id_status_pickup_time``, so the cost of a page does not
+    grow with the shop's order history. Returns the orders and the cursor
+    for the next page (``None`` on the last page).
+    """
+    today = today or date.today()
+    start_of_day = datetime.combine(today, time.min)
+    query = Order.query.filter(Order.shop_id == shop_id).options(*order_loader_options())
+    if status in ORDER_STATUSES:
+        query = query.filter(Order.status == status)
+    if window == 'today':
+        query = query.filter(Order.pickup_time >= start_of_day,
+                             Order.pickup_time < start_of_day + timedelta(days=1))
+    elif window == 'upcoming':
+        query = query.filter(Order.pickup_time >= start_of_day)
+    elif window == 'past':
+        query = query.filter(Order.pickup_time < start_of_day)
+
+    descending = window == 'past'
+    after = decode_cursor(cursor, key_type=datetime.fromisoformat)
+    if after:
+        last_time, last_id = after
+        if descending:
+            query = query.filter(or_(Order.pickup_time < last_time,
+                                     and_(Order.pickup_time == last_time, Order.id < last_id)))
+        else:
+            query = query.filter(or_(Order.pickup_time > last_time,
+                                     and_(Order.pickup_time == last_time, Order.id > last_id)))
+    if descending:
+        query = query.order_by(Order.pickup_time.desc(), Order.id.desc())
+    else:
+        query = query.order_by(Order.pickup_time.asc(), Order.id.asc())
+
+    orders = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor([orders[-1].pickup_time.isoformat(), orders[-1].id])
+    return orders, next_cursor
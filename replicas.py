@@ -0,0 +1,85 @@
+import random
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+import engine_profiles
+
+PRIMARY_UNTIL = '_primary_until'
+
+
+def read_only(view):
+    """Mark ``view`` as safe to serve from a read replica.
+
+    Only marked views read from replicas; writes they make still go to the
+    primary. Put it below ``@login_required`` and the route decorator.
+    """
+    view.read_replica = True
+    return view
+
+
+def configure(app):
+    """Register every ``DATABASE_REPLICA_URLS`` entry as a bind
+    (``replica_0``, ``replica_1``, ...) and route marked views to them.
+    Call before ``db.init_app``."""
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    keys = []
+    for number, url in enumerate(app.config['DATABASE_REPLICA_URLS']):
+        key = f'replica_{number}'
+        binds[key] = {'url': url, **engine_profiles.engine_options(app.config, url)}
+        keys.append(key)
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.extensions['read_replicas'] = keys
+    if keys:
+        app.before_request(choose_replica)
+
+
+def choose_replica():
+    """Pick this request's replica, or none: the view is not marked, or
+    this browser wrote within ``READ_YOUR_WRITES_SECONDS``."""
+    g.read_replica = None
+    view = current_app.view_functions.get(request.endpoint)
+    if not getattr(view, 'read_replica', False):
+        return
+    if session.get(PRIMARY_UNTIL, 0) > time.time():
+        return
+    # 同一個請求固定讀同一台副本，頁面上的資料才一致
+    g.read_replica = random.choice(current_app.extensions['read_replicas'])
+
+
+def stick_to_primary():
+    """Serve this browser's next requests from the primary so it reads its
+    own writes while the replicas catch up."""
+    g.read_replica = None
+    window = current_app.config['READ_YOUR_WRITES_SECONDS']
+    if window and current_app.extensions.get('read_replicas'):
+        session[PRIMARY_UNTIL] = time.time() + window
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. before a write that
+    depends on what was read."""
+    replica = g.get('read_replica')
+    g.read_replica = None
+    try:
+        yield
+    finally:
+        g.read_replica = replica
+
+
+class RoutingSession(Session):
+    """``db.session`` that sends reads to the request's replica (see
+    ``choose_replica``) and everything else to the primary. Any flush or
+    INSERT/UPDATE/DELETE made during a request calls ``stick_to_primary``."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # 背景執行緒與 CLI 沒有請求，一律使用主資料庫
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                stick_to_primary()
+            elif g.get('read_replica'):
+                return self._db.engines[g.read_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -1,9 +1,16 @@
-from app import app
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+from app import create_app
 from extensions import db
 from models import Shop, Food, User
-from datetime import datetime, timedelta
+from site_stats import refresh_stats
 
-def seed_data():
+def seed_data(app):
     with app.app_context():
         # 清空現有資料
         db.drop_all()
@@ -304,9 +311,177 @@ def seed_data():
         ]
 
         db.session.add_all(foods)
+        refresh_stats()
         db.session.commit()
 
         print("假資料建立完成！")
 
+
+# --- 大量測試資料產生器 ---
+CATEGORIES = ['便當', '麵包', '蔬果', '熟食', '甜點', '飲料', None]
+PHOTOS = ['img/food-bento.png', 'img/food-fruit.png', 'img/food-rice.png', 'img/food-salad.png',
+          'img/food-veg.png', 'img/food-default.svg']
+HOURS = [('07:00', '21:00'), ('09:00', '22:00'), ('10:00', '20:00'), ('18:00', '02:00'), (None, None)]
+
+
+def _time(value):
+    return datetime.strptime(value, '%H:%M').time() if value else None
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_data(engine, users=1000, shops=100, foods_per_shop=10, orders=10000, days=90,
+                  center=(25.0330, 121.5654), radius_km=20.0, chunk=10000, seed=42, log=print):
+    """Bulk-load synthetic data into empty tables.
+
+    Customers get ids ``1..users``, shop owners ``users + 1..users + shops``
+    and one admin (``admin@example.com`` / ``admin123``) comes last; every
+    other account's password is ``password``, hashed once. Shops are spread
+    uniformly over a disc of ``radius_km`` around ``center``. Orders have
+    pickup times over the past ``days`` days (completed, cancelled or no-show)
+    plus some pending ones later today. Rows are produced lazily and written
+    with executemany in batches of ``chunk``, so memory stays flat however
+    many rows are requested. Returns the number of rows per table.
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    password_hash = generate_password_hash('password')
+    tables = db.metadata.tables
+    counts = {}
+
+    def user_rows():
+        for i in range(1, users + 1):
+            yield {'id': i, 'name': f'用戶{i}', 'email': f'user{i}@example.com', 'phone': f'09{i % 10 ** 8:08d}',
+                   'password_hash': password_hash, 'role': 'user', 'created_at': now - timedelta(days=rng.randint(0, 365))}
+        for i in range(1, shops + 1):
+            yield {'id': users + i, 'name': f'店長{i}', 'email': f'shop{i}@example.com', 'phone': f'02{i % 10 ** 8:08d}',
+                   'password_hash': password_hash, 'role': 'shop', 'created_at': now - timedelta(days=365)}
+        yield {'id': users + shops + 1, 'name': 'Admin', 'email': 'admin@example.com', 'phone': None, 'role': 'admin',
+               'password_hash': generate_password_hash('admin123'), 'created_at': now - timedelta(days=365)}
+
+    def shop_rows():
+        lat0, lng0 = center
+        for i in range(1, shops + 1):
+            # 在圓盤內均勻分布：半徑取平方根
+            distance = radius_km * math.sqrt(rng.random())
+            bearing = rng.uniform(0, 2 * math.pi)
+            opening, closing = rng.choice(HOURS)
+            yield {'id': i, 'name': f'惜食商家 {i}', 'owner_id': users + i, 'manager_email': f'shop{i}@example.com',
+                   'phone': f'02{i % 10 ** 8:08d}', 'address': f'測試路 {i} 號',
+                   'latitude': lat0 + distance * math.cos(bearing) / 111.195,
+                   'longitude': lng0 + distance * math.sin(bearing) / (111.195 * math.cos(math.radians(lat0))),
+                   'opening_time': _time(opening), 'closing_time': _time(closing),
+                   'rating': round(rng.uniform(3, 5), 1), 'created_at': now - timedelta(days=365), 'stock_version': 0}
+
+    def food_rows():
+        for shop_id in range(1, shops + 1):
+            for n in range(foods_per_shop):
+                expires = now + timedelta(hours=rng.randint(-24, 72))
+                yield {'id': (shop_id - 1) * foods_per_shop + n + 1, 'shop_id': shop_id, 'name': f'剩食 {n + 1}',
+                       'category': rng.choice(CATEGORIES), 'quantity': rng.randint(0, 30), 'expiry_time': expires,
+                       'photo_url': rng.choice(PHOTOS), 'description': None,
+                       'is_active': expires > now and rng.random() < 0.9, 'created_at': now - timedelta(days=1)}
+
+    item_buffer = []
+
+    def order_rows():
+        for order_id in range(1, orders + 1):
+            shop_id = rng.randint(1, shops)
+            if rng.random() < 0.05:
+                # 今天稍晚待取貨的訂單
+                pickup = now + timedelta(minutes=rng.randint(10, 600))
+                status = 'pending'
+            else:
+                pickup = now - timedelta(minutes=rng.randint(60, days * 24 * 60))
+                status = 'completed' if rng.random() < 0.8 else 'cancelled'
+            created = pickup - timedelta(minutes=rng.randint(10, 240))
+            cancelled_at = None
+            if status == 'cancelled':
+                # 約一半是未到取，由清理程序在取貨時間後取消
+                cancelled_at = pickup + timedelta(minutes=30) if rng.random() < 0.5 else created + timedelta(minutes=5)
+            yield {'id': order_id, 'user_id': rng.randint(1, users), 'shop_id': shop_id, 'pickup_time': pickup,
+                   'status': status, 'created_at': created,
+                   'completed_at': pickup if status == 'completed' else None, 'cancelled_at': cancelled_at}
+            first_food = (shop_id - 1) * foods_per_shop + 1
+            for food_id in rng.sample(range(first_food, first_food + foods_per_shop), min(rng.randint(1, 3), foods_per_shop)):
+                item_buffer.append({'order_id': order_id, 'food_id': food_id, 'quantity': rng.randint(1, 3)})
+
+    def load(conn, name, rows):
+        started = time.perf_counter()
+        total = 0
+        for batch in _chunks(rows, chunk):
+            conn.execute(tables[name].insert(), batch)
+            total += len(batch)
+            # 訂單品項跟著訂單一起產生，累積到一批就寫入
+            if name == 'orders' and len(item_buffer) >= chunk:
+                counts['order_items'] = counts.get('order_items', 0) + len(item_buffer)
+                conn.execute(tables['order_items'].insert(), item_buffer)
+                item_buffer.clear()
+        if name == 'orders' and item_buffer:
+            counts['order_items'] = counts.get('order_items', 0) + len(item_buffer)
+            conn.execute(tables['order_items'].insert(), item_buffer)
+            item_buffer.clear()
+        counts[name] = total
+        log(f'  {name}: {total} rows in {time.perf_counter() - started:.1f}s')
+        if name == 'orders':
+            log(f'  order_items: {counts.get("order_items", 0)} rows')
+
+    with engine.begin() as conn:
+        if conn.dialect.name == 'sqlite':
+            # 只是測試資料：關閉同步寫入以加快載入
+            conn.execute(text('PRAGMA synchronous=OFF'))
+        load(conn, 'users', user_rows())
+        load(conn, 'shops', shop_rows())
+        load(conn, 'foods', food_rows())
+        if shops and foods_per_shop and users:
+            load(conn, 'orders', order_rows())
+        if conn.dialect.name == 'postgresql':
+            # 明確指定 id 後，把序列推到最大值之後
+            for name in ('users', 'shops', 'foods', 'orders', 'order_items'):
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                                  f"COALESCE((SELECT MAX(id) FROM {name}), 0) + 1, false)"))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load demo data, or synthetic data in bulk with --users/--shops.')
+    parser.add_argument('--users', type=int, help='number of customer accounts (enables the bulk generator)')
+    parser.add_argument('--shops', type=int, default=100)
+    parser.add_argument('--foods-per-shop', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=90, help='spread historical orders over this many days')
+    parser.add_argument('--center', default='25.0330,121.5654', help='lat,lng of the region centre')
+    parser.add_argument('--radius-km', type=float, default=20.0)
+    parser.add_argument('--chunk', type=int, default=10000, help='rows per INSERT batch')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    app = create_app()
+    if args.users is None:
+        seed_data(app)
+        return
+
+    lat, lng = (float(value) for value in args.center.split(','))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'Generating into {db.engine.url.render_as_string()} ...')
+        started = time.perf_counter()
+        generate_data(db.engine, users=args.users, shops=args.shops, foods_per_shop=args.foods_per_shop,
+                      orders=args.orders, days=args.days, center=(lat, lng), radius_km=args.radius_km,
+                      chunk=args.chunk, seed=args.seed)
+        refresh_stats()
+        db.session.commit()
+        print(f'Done in {time.perf_counter() - started:.1f}s')
+
+
 if __name__ == "__main__":
-    seed_data()
+    main()
@@ -0,0 +1,66 @@
+import random
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import User, Shop, Order, SiteStat
+from replicas import use_primary
+
+STAT_NAMES = ('total_orders', 'total_users', 'total_shops')
+SHARDS = 8
+
+
+def _true_counts():
+    row = db.session.execute(select(
+        select(func.count(Order.id)).scalar_subquery(),
+        select(func.count(User.id)).where(User.role == 'user').scalar_subquery(),
+        select(func.count(Shop.id)).scalar_subquery(),
+    )).one()
+    return dict(zip(STAT_NAMES, row))
+
+
+def refresh_stats():
+    """Recount every statistic from the base tables. The caller commits."""
+    totals = _true_counts()
+    db.session.execute(delete(SiteStat))
+    db.session.execute(SiteStat.__table__.insert(), [
+        {'name': name, 'shard': shard, 'value': totals[name] if shard == 0 else 0}
+        for name in STAT_NAMES for shard in range(SHARDS)
+    ])
+    return totals
+
+
+def adjust_stats(**deltas):
+    """Add ``deltas`` (e.g. ``total_orders=1``) inside the caller's transaction."""
+    shard = random.randrange(SHARDS)
+    for name, delta in deltas.items():
+        if delta:
+            db.session.execute(
+                update(SiteStat)
+                .where(SiteStat.name == name, SiteStat.shard == shard)
+                .values(value=SiteStat.value + delta)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def read_stats():
+    """Headline numbers for the admin dashboard: one query over a few rows.
+
+    The summary is built from the base tables the first time it is read on
+    an empty database; ``flask refresh-stats`` recounts it on demand.
+    """
+    rows = db.session.execute(
+        select(SiteStat.name, func.sum(SiteStat.value)).group_by(SiteStat.name)
+    ).all()
+    stats = {name: int(value) for name, value in rows}
+    if set(STAT_NAMES) <= stats.keys():
+        return stats
+    # 副本可能還沒同步到統計表；重建與重讀都在主資料庫上進行
+    with use_primary():
+        try:
+            stats = refresh_stats()
+            db.session.commit()
+        except IntegrityError:
+            # 另一個請求同時建好了統計表
+            db.session.rollback()
+            return read_stats()
+    return stats
@@ -1,7 +1,7 @@
 document.addEventListener('DOMContentLoaded', function() {
     var mapElement = document.getElementById('map');
-    var shopCards = document.querySelectorAll('.shop-card');
-    var locateButtons = document.querySelectorAll('.btn-locate');
+    var loadMoreBtn = document.getElementById('btn-load-more');
+    var sortDistanceBtn = document.getElementById('btn-sort-distance');
     var markersById = {};
     var mapInstance = null;
     var userMarker = null;
@@ -10,6 +10,11 @@ document.addEventListener('DOMContentLoaded', function() {
     var latInput = document.querySelector('input[name="latitude"]');
     var lngInput = document.querySelector('input[name="longitude"]');
 
+    // 商家卡片會分頁載入，每次都重新查詢目前已在頁面上的卡片
+    function getShopCards() {
+        return document.querySelectorAll('.shop-card');
+    }
+
     function addBadge(card, type, text) {
         var container = card.querySelector('.shop-badges');
         if (!container || container.querySelector('[data-badge="' + type + '"]')) {
@@ -69,10 +74,11 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function applyMostSupplyBadge() {
-        var quantities = Array.from(shopCards).map(function(card) {
+        var shopCards = getShopCards();
+        // 伺服器提供全部商家的最大值，只載入部分卡片時徽章仍然正確
+        var maxQty = typeof maxQuantity !== 'undefined' ? maxQuantity : Math.max.apply(null, Array.from(shopCards).map(function(card) {
             return parseInt(card.dataset.quantity || '0', 10);
-        });
-        var maxQty = Math.max.apply(null, quantities);
+        }));
         if (!isFinite(maxQty) || maxQty <= 0) return;
         shopCards.forEach(function(card, idx) {
             clearBadge(card, 'most');
@@ -85,39 +91,13 @@ document.addEventListener('DOMContentLoaded', function() {
         setMarkerIcons();
     }
 
-    function haversine(lat1, lon1, lat2, lon2) {
-        function toRad(value) {
-            return value * Math.PI / 180;
-        }
-        var R = 6371; // km
-        var dLat = toRad(lat2 - lat1);
-        var dLon = toRad(lon2 - lon1);
-        var a = Math.sin(dLat / 2) * Math.sin(dLat / 2) +
-                Math.cos(toRad(lat1)) * Math.cos(toRad(lat2)) *
-                Math.sin(dLon / 2) * Math.sin(dLon / 2);
-        var c = 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
-        return R * c;
-    }
+    // 最近的商家由伺服器端空間索引計算，只在目前已載入的卡片上標記
+    var nearestShopId = null;
 
-    function applyNearestBadge(userLat, userLng) {
-        var nearestCards = [];
-        var minDistance = Infinity;
-        shopCards.forEach(function(card) {
+    function markNearestCard() {
+        getShopCards().forEach(function(card) {
             clearBadge(card, 'nearest');
-            var lat = parseFloat(card.dataset.lat);
-            var lng = parseFloat(card.dataset.lng);
-            if (isNaN(lat) || isNaN(lng)) return;
-            var distance = haversine(userLat, userLng, lat, lng);
-            if (distance < minDistance - 0.01) {
-                minDistance = distance;
-                nearestCards = [card];
-            } else if (Math.abs(distance - minDistance) < 0.01) {
-                nearestCards.push(card);
-            }
-        });
-        if (!isFinite(minDistance) || minDistance === Infinity) return;
-        nearestCards.forEach(function(card) {
-            if (badgeLabels && badgeLabels.nearest) {
+            if (nearestShopId !== null && card.dataset.id === nearestShopId && badgeLabels && badgeLabels.nearest) {
                 addBadge(card, 'nearest', badgeLabels.nearest);
             }
         });
@@ -125,9 +105,94 @@ document.addEventListener('DOMContentLoaded', function() {
         setMarkerIcons();
     }
 
+    function applyNearestBadge(userLat, userLng) {
+        if (typeof nearestApiUrl === 'undefined') return;
+        var url = nearestApiUrl + '?k=1&lat=' + encodeURIComponent(userLat) + '&lng=' + encodeURIComponent(userLng);
+        fetch(url)
+            .then(function(response) { return response.json(); })
+            .then(function(data) {
+                nearestShopId = data.shops && data.shops.length ? String(data.shops[0].id) : null;
+                markNearestCard();
+            })
+            .catch(function() {
+                // ignore errors
+            });
+    }
+
     // 首頁載入就先標記「物資最多」
     applyMostSupplyBadge();
 
+    // 依距離排序需要使用者位置，取得後帶著經緯度重新載入列表
+    if (sortDistanceBtn) {
+        sortDistanceBtn.addEventListener('click', function() {
+            var baseUrl = this.dataset.url;
+            if (!navigator.geolocation) return;
+            navigator.geolocation.getCurrentPosition(function(pos) {
+                var sep = baseUrl.indexOf('?') === -1 ? '?' : '&';
+                window.location.href = baseUrl + sep + 'lat=' + pos.coords.latitude.toFixed(6) + '&lng=' + pos.coords.longitude.toFixed(6);
+            });
+        });
+    }
+
+    function loadMoreShops() {
+        var url = loadMoreBtn.dataset.nextUrl;
+        if (!url) return;
+        loadMoreBtn.disabled = true;
+        fetch(url, { headers: { 'X-Requested-With': 'fetch' } })
+            .then(function(response) {
+                var nextUrl = response.headers.get('X-Next-Page');
+                return response.text().then(function(html) {
+                    return { html: html, nextUrl: nextUrl };
+                });
+            })
+            .then(function(page) {
+                var container = document.getElementById('nearby-shops');
+                var template = document.createElement('template');
+                template.innerHTML = page.html;
+                var newCards = Array.from(template.content.querySelectorAll('.shop-card'));
+                container.appendChild(template.content);
+                onCardsAdded(newCards);
+                if (page.nextUrl) {
+                    loadMoreBtn.dataset.nextUrl = page.nextUrl;
+                    loadMoreBtn.disabled = false;
+                } else {
+                    loadMoreBtn.remove();
+                }
+            })
+            .catch(function() {
+                loadMoreBtn.disabled = false;
+            });
+    }
+
+    // 新卡片加入後：補上地圖標記、定位按鈕，並重新計算徽章
+    function onCardsAdded(cards) {
+        bindLocateButtons(cards);
+        applyMostSupplyBadge();
+        markNearestCard();
+    }
+
+    if (loadMoreBtn) {
+        loadMoreBtn.addEventListener('click', loadMoreShops);
+    }
+    bindLocateButtons(Array.from(getShopCards()));
+
+    function bindLocateButtons(cards) {
+        cards.forEach(function(card) {
+            var btn = card.querySelector('.btn-locate');
+            if (!btn) return;
+            btn.addEventListener('click', function() {
+                var lat = parseFloat(this.dataset.lat);
+                var lng = parseFloat(this.dataset.lng);
+                if (isNaN(lat) || isNaN(lng) || !mapInstance) return;
+                mapInstance.setView([lat, lng], 16);
+                var marker = markersById[this.dataset.shopId];
+                if (marker) {
+                    marker.openPopup();
+                }
+            });
+        });
+    }
+
     // 商家註冊：一鍵填入目前經緯度（無需地圖）
     if (fillLocationBtn && latInput && lngInput) {
         fillLocationBtn.addEventListener('click', function() {
@@ -142,6 +207,49 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // 商家後台：統計面板由 JSON API 填入，不拖慢後台頁面本身
+    var analyticsPanel = document.getElementById('shop-analytics');
+    if (analyticsPanel) {
+        fetch(analyticsPanel.dataset.url, { credentials: 'same-origin' })
+            .then(function(resp) { return resp.ok ? resp.json() : null; })
+            .then(function(data) {
+                if (!data) return;
+                var formatRate = function(rate) {
+                    return rate === null ? '--' : Math.round(rate * 100) + '%';
+                };
+                analyticsPanel.querySelector('[data-stat="units"]').textContent = data.totals.units;
+                analyticsPanel.querySelector('[data-stat="completion_rate"]').textContent = formatRate(data.totals.completion_rate);
+                analyticsPanel.querySelector('[data-stat="no_show_rate"]').textContent = formatRate(data.totals.no_show_rate);
+
+                var dayList = analyticsPanel.querySelector('[data-list="days"]');
+                data.days.filter(function(day) { return day.orders > 0; }).slice(-7).reverse().forEach(function(day) {
+                    var row = document.createElement('tr');
+                    [day.day, day.orders, day.units].forEach(function(value) {
+                        var cell = document.createElement('td');
+                        cell.textContent = value;
+                        row.appendChild(cell);
+                    });
+                    dayList.appendChild(row);
+                });
+
+                var categoryList = analyticsPanel.querySelector('[data-list="categories"]');
+                Object.keys(data.totals.by_category).sort(function(a, b) {
+                    return data.totals.by_category[b] - data.totals.by_category[a];
+                }).forEach(function(category) {
+                    var item = document.createElement('li');
+                    item.className = 'list-group-item d-flex justify-content-between';
+                    var name = document.createElement('span');
+                    name.textContent = category || categoryList.dataset.defaultLabel;
+                    var units = document.createElement('span');
+                    units.className = 'badge bg-success';
+                    units.textContent = data.totals.by_category[category];
+                    item.appendChild(name);
+                    item.appendChild(units);
+                    categoryList.appendChild(item);
+                });
+            });
+    }
+
     if (!mapElement) {
         return;
     }
@@ -164,7 +272,7 @@ document.addEventListener('DOMContentLoaded', function() {
     var iconUser = coloredIcon('marker-user');
 
     function setMarkerIcons() {
-        shopCards.forEach(function(card) {
+        getShopCards().forEach(function(card) {
             var id = card.dataset.id;
             if (!id || !markersById[id]) return;
             var marker = markersById[id];
@@ -215,34 +323,72 @@ document.addEventListener('DOMContentLoaded', function() {
     // 自動嘗試取得位置
     requestUserLocation(false);
 
-    if (typeof shopData !== 'undefined') {
-        shopData.forEach(function(shop) {
-            if (!shop.lat || !shop.lng) return;
-            var marker = L.marker([shop.lat, shop.lng], { icon: iconDefault }).addTo(map);
-            var remainingText = (window.transRemaining || 'Remaining') + ': ' + shop.food_count;
-            marker.bindPopup('<b>' + shop.name + '</b><br>' + shop.address + '<br>' + remainingText);
-            if (shop.id) {
-                markersById[shop.id] = marker;
-            }
+    // 地圖標記由 /api/shops 依目前可視範圍取得，與分頁載入的卡片無關
+    function popupContent(shop) {
+        var wrapper = document.createElement('div');
+        var title = document.createElement('b');
+        title.textContent = shop.name || '';
+        wrapper.appendChild(title);
+        wrapper.appendChild(document.createElement('br'));
+        wrapper.appendChild(document.createTextNode(shop.address || ''));
+        wrapper.appendChild(document.createElement('br'));
+        wrapper.appendChild(document.createTextNode((window.transRemaining || 'Remaining') + ': ' + (shop.remaining || 0)));
+        return wrapper;
+    }
+
+    function rowsToShops(payload) {
+        return payload.rows.map(function(row) {
+            var shop = {};
+            payload.fields.forEach(function(field, idx) {
+                shop[field] = row[idx];
+            });
+            return shop;
         });
+    }
 
-        // 若沒有定位，用第一個商家當中心
-        if (!hasUserLocation && shopData.length && shopData[0].lat && shopData[0].lng) {
-            map.setView([shopData[0].lat, shopData[0].lng], 13);
-        }
+    function loadMapShops() {
+        if (typeof shopsApiUrl === 'undefined') return;
+        var bounds = map.getBounds();
+        var bbox = [bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast()].map(function(v) {
+            return v.toFixed(4);
+        }).join(',');
+        // 瀏覽器會自動帶 If-None-Match，資料未變時伺服器回 304
+        fetch(shopsApiUrl + '?bbox=' + bbox)
+            .then(function(response) { return response.json(); })
+            .then(function(payload) {
+                rowsToShops(payload).forEach(function(shop) {
+                    if (shop.lat === null || shop.lng === null) return;
+                    var marker = markersById[shop.id];
+                    if (!marker) {
+                        marker = L.marker([shop.lat, shop.lng], { icon: iconDefault }).addTo(map);
+                        markersById[shop.id] = marker;
+                    }
+                    marker.bindPopup(popupContent(shop));
+                });
+                setMarkerIcons();
+            })
+            .catch(function() {
+                // ignore errors
+            });
     }
-    locateButtons.forEach(function(btn) {
-        btn.addEventListener('click', function() {
-            var lat = parseFloat(this.dataset.lat);
-            var lng = parseFloat(this.dataset.lng);
-            if (isNaN(lat) || isNaN(lng) || !mapInstance) return;
-            mapInstance.setView([lat, lng], 16);
-            var marker = markersById[this.dataset.shopId];
-            if (marker) {
-                marker.openPopup();
-            }
-        });
+
+    var refreshTimer = null;
+    map.on('moveend', function() {
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(loadMapShops, 250);
+    });
+    setInterval(loadMapShops, 60000);
+
+    var initialCards = Array.from(getShopCards());
+
+    // 若沒有定位，用第一個有座標的商家當中心
+    var firstLocated = initialCards.find(function(card) {
+        return card.dataset.lat && card.dataset.lng;
     });
+    if (!hasUserLocation && firstLocated) {
+        map.setView([parseFloat(firstLocated.dataset.lat), parseFloat(firstLocated.dataset.lng)], 13);
+    }
+    loadMapShops();
 
     var myLocationBtn = document.getElementById('btn-my-location');
     if (myLocationBtn) {
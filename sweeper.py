@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from extensions import db
+from models import Food, Order
+from inventory import cancel_orders, bump_stock_version
+
+
+def cancel_overdue_orders(cutoff, batch_size):
+    """Cancel pending orders whose pickup time is before ``cutoff``.
+
+    Works through the ``(status, pickup_time)`` index one batch at a time and
+    commits after each batch so locks stay short. Returns ``(orders, batches)``.
+    """
+    cancelled = batches = 0
+    while True:
+        ids = db.session.execute(
+            select(Order.id)
+            .where(Order.status == 'pending', Order.pickup_time < cutoff)
+            .order_by(Order.pickup_time)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return cancelled, batches
+        cancelled += len(cancel_orders(ids))
+        db.session.commit()
+        batches += 1
+
+
+def deactivate_expired_foods(now, batch_size):
+    """Take foods past ``expiry_time`` off the shelf, in batches."""
+    deactivated = batches = 0
+    while True:
+        rows = db.session.execute(
+            select(Food.id, Food.shop_id)
+            .where(Food.is_active.is_(True), Food.expiry_time < now)
+            .order_by(Food.expiry_time)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return deactivated, batches
+        deactivated += db.session.execute(
+            update(Food)
+            .where(Food.id.in_([row.id for row in rows]), Food.is_active.is_(True))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        bump_stock_version(*{row.shop_id for row in rows})
+        db.session.commit()
+        batches += 1
+
+
+class ExpirySweeper:
+    """Runs the expiry sweep and keeps statistics about recent runs."""
+
+    def __init__(self, history=20):
+        self.runs = deque(maxlen=history)
+        self.totals = {'runs': 0, 'orders_cancelled': 0, 'foods_deactivated': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def run(self, now=None, batch_size=500, grace=timedelta(0)):
+        """One sweep; returns a dict describing the work done."""
+        now = now or datetime.now()
+        started = time.perf_counter()
+        orders, order_batches = cancel_overdue_orders(now - grace, batch_size)
+        foods, food_batches = deactivate_expired_foods(now, batch_size)
+        stats = {
+            'started_at': now.isoformat(timespec='seconds'),
+            'orders_cancelled': orders,
+            'foods_deactivated': foods,
+            'batches': order_batches + food_batches,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+        with self._lock:
+            self.runs.append(stats)
+            self.totals['runs'] += 1
+            self.totals['orders_cancelled'] += orders
+            self.totals['foods_deactivated'] += foods
+        return stats
+
+    def run_for(self, app):
+        return self.run(batch_size=app.config['EXPIRY_SWEEP_BATCH'],
+                        grace=timedelta(minutes=app.config['NO_SHOW_GRACE_MINUTES']))
+
+    def stats(self):
+        with self._lock:
+            return {'totals': dict(self.totals), 'runs': list(self.runs)}
+
+    def start(self, app, interval):
+        """Sweep every ``interval`` seconds in a daemon thread of this process."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                with app.app_context():
+                    try:
+                        stats = self.run_for(app)
+                        if stats['orders_cancelled'] or stats['foods_deactivated']:
+                            app.logger.info('expiry sweep %s', stats)
+                    except Exception:
+                        db.session.rollback()
+                        app.logger.exception('expiry sweep failed')
+                    finally:
+                        db.session.remove()
+
+        self._thread = threading.Thread(target=loop, name='expiry-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+sweeper = ExpirySweeper()
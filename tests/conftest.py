@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from extensions import db
+from geo import shop_index
+from identity import identity_cache
+from throttle import login_throttle
+
+
+@pytest.fixture
+def test_app():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    with app.app_context():
+        db.create_all()
+        shop_index.invalidate()
+        identity_cache.clear()
+        login_throttle.clear()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(test_app):
+    return test_app.test_client()
+
+
+@pytest.fixture
+def count_queries(test_app):
+    """Context manager factory recording SQL statements sent to the engine."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+    return counter
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+
+import analytics
+from analytics import shop_analytics, compute_days
+from app import db
+from models import User, Shop, Food, Order, OrderItem, ShopDailyStat
+
+
+def seed(today):
+    user = User(name="Customer", email="customer@test.com")
+    owner = User(name="Owner", email="owner@test.com", role='shop')
+    owner.set_password('pw')
+    shop = Shop(name="Bakery", manager_email="owner@test.com", owner=owner)
+    db.session.add_all([user, owner, shop])
+    db.session.flush()
+    bread = Food(shop_id=shop.id, name="Bread", category="Bakery", quantity=0)
+    soup = Food(shop_id=shop.id, name="Soup", quantity=0)
+    db.session.add_all([bread, soup])
+    db.session.flush()
+
+    def order(days_ago, status, items, cancelled_late=False):
+        pickup = datetime.combine(today - timedelta(days=days_ago), datetime.min.time()) + timedelta(hours=12)
+        cancelled_at = None
+        if status == 'cancelled':
+            cancelled_at = pickup + timedelta(hours=1 if cancelled_late else -1)
+        o = Order(user_id=user.id, shop_id=shop.id, pickup_time=pickup, status=status, cancelled_at=cancelled_at)
+        db.session.add(o)
+        for food, quantity in items:
+            db.session.add(OrderItem(order=o, food_id=food.id, quantity=quantity))
+
+    order(5, 'completed', [(bread, 2), (soup, 1)])
+    order(5, 'cancelled', [(bread, 1)], cancelled_late=True)
+    order(3, 'completed', [(bread, 4)])
+    order(3, 'cancelled', [(soup, 1)])
+    order(0, 'completed', [(soup, 3)])
+    order(0, 'pending', [(bread, 1)])
+    db.session.commit()
+    return shop.id
+
+
+def test_shop_analytics_buckets_and_rates(test_app):
+    today = date(2026, 5, 10)
+    with test_app.app_context():
+        shop_id = seed(today)
+        result = shop_analytics(shop_id, today - timedelta(days=6), today + timedelta(days=1),
+                                settled_before=today - timedelta(days=1))
+        days = {day['day']: day for day in result['days']}
+        assert len(days) == 7
+        assert days['2026-05-05'] == {'day': '2026-05-05', 'orders': 2, 'completed': 1, 'cancelled': 1,
+                                      'no_shows': 1, 'units': 3, 'by_category': {'Bakery': 2, '': 1}}
+        assert days['2026-05-07']['no_shows'] == 0
+        assert days['2026-05-10']['units'] == 3
+        totals = result['totals']
+        assert totals['units'] == 10 and totals['orders'] == 6
+        assert totals['by_category'] == {'Bakery': 6, '': 4}
+        assert totals['completion_rate'] == 0.6 and totals['no_show_rate'] == 0.2
+
+
+def test_closed_days_are_cached_and_not_recomputed(test_app, count_queries):
+    today = date(2026, 5, 10)
+    with test_app.app_context():
+        shop_id = seed(today)
+        args = (shop_id, today - timedelta(days=6), today + timedelta(days=1), today - timedelta(days=1))
+        first = shop_analytics(*args)
+        assert ShopDailyStat.query.count() == 5
+
+        # 結算後的日期改變不影響快取；之後只有未結算的日期即時計算
+        db.session.query(Order).filter(Order.pickup_time < datetime(2026, 5, 6)).delete()
+        db.session.commit()
+        with count_queries() as statements:
+            second = shop_analytics(*args)
+        assert second == first
+        assert len(statements) == 3
+
+
+def test_analytics_endpoint_requires_shop(test_app, client):
+    with test_app.app_context():
+        seed(date.today())
+    assert client.get('/shop/analytics').status_code in (302, 401)
+    client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+    data = client.get('/shop/analytics?days=7').get_json()
+    assert len(data['days']) == 7
+    assert data['totals']['orders'] == 6
+
+
+def test_status_changes_refresh_cached_days(test_app, client):
+    today = date.today()
+    with test_app.app_context():
+        shop_id = seed(today)
+        pickup = datetime.combine(today - timedelta(days=4), datetime.min.time()) + timedelta(hours=12)
+        late = Order(user_id=User.query.filter_by(role='user').one().id, shop_id=shop_id,
+                     pickup_time=pickup, status='pending')
+        db.session.add(late)
+        db.session.commit()
+        late_id = late.id
+        completed_id = Order.query.filter_by(status='completed').order_by(Order.pickup_time).first().id
+        window = (shop_id, today - timedelta(days=6), today + timedelta(days=1))
+
+        def day(days_ago):
+            return {d['day']: d for d in shop_analytics(*window)['days']}[(today - timedelta(days=days_ago)).isoformat()]
+
+        # 還有待取貨訂單的日期不寫入快取
+        assert day(4)['orders'] == 1 and day(4)['completed'] == 0
+        assert ShopDailyStat.query.count() == 4
+
+        client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+        client.post(f'/shop/orders/{late_id}/status', data={'status': 'completed'})
+        assert day(4)['completed'] == 1
+        assert ShopDailyStat.query.count() == 5
+
+        # 已快取的日期在商家改變狀態後重新計算
+        client.post(f'/shop/orders/{completed_id}/status', data={'status': 'cancelled'})
+        assert day(5)['completed'] == 0 and day(5)['cancelled'] == 2 and day(5)['units'] == 0
+
+
+def test_only_missing_runs_are_recomputed(test_app, monkeypatch):
+    today = date(2026, 5, 10)
+    with test_app.app_context():
+        shop_id = seed(today)
+        start, end = today - timedelta(days=8), today - timedelta(days=1)
+        shop_analytics(shop_id, start + timedelta(days=1), end - timedelta(days=1), settled_before=end)
+        assert ShopDailyStat.query.count() == 5
+
+        ranges = []
+
+        def recording(shop_id, run_start, run_end):
+            ranges.append((run_start, run_end))
+            return compute_days(shop_id, run_start, run_end)
+
+        monkeypatch.setattr(analytics, 'compute_days', recording)
+        # 兩端各缺一天：各自重算，中間已快取的日期不再計算
+        result = shop_analytics(shop_id, start, end, settled_before=end)
+        assert ranges == [(start, start + timedelta(days=1)), (end - timedelta(days=1), end)]
+        assert ShopDailyStat.query.count() == 7
+        assert result['totals']['orders'] == 4
@@ -0,0 +1,65 @@
+from app import db
+from inventory import bump_stock_version
+from models import Shop, Food
+
+
+def seed_shop():
+    shop = Shop(name='Quote "Shop" </script>', manager_email="api@test.com", latitude=25.0, longitude=121.5)
+    db.session.add(shop)
+    db.session.flush()
+    db.session.add(Food(shop_id=shop.id, name="Rice", quantity=4, is_active=True, photo_url="img/food-rice.png"))
+    db.session.commit()
+    return shop.id
+
+
+def test_shops_api_is_compact_and_revalidates_with_etag(test_app, client):
+    with test_app.app_context():
+        shop_id = seed_shop()
+
+    resp = client.get('/api/shops')
+    payload = resp.get_json()
+    assert payload['fields'] == ['id', 'name', 'address', 'lat', 'lng', 'remaining']
+    assert payload['rows'] == [[shop_id, 'Quote "Shop" </script>', None, 25.0, 121.5, 4]]
+    assert b', ' not in resp.data
+    assert resp.headers['ETag']
+    assert 'max-age' in resp.headers['Cache-Control']
+
+    cached = client.get('/api/shops', headers={'If-None-Match': resp.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    with test_app.app_context():
+        bump_stock_version(shop_id)
+        db.session.commit()
+    changed = client.get('/api/shops', headers={'If-None-Match': resp.headers['ETag']})
+    assert changed.status_code == 200
+
+
+def test_shop_foods_api_etag_follows_stock_version(test_app, client):
+    with test_app.app_context():
+        shop_id = seed_shop()
+
+    resp = client.get(f'/api/shops/{shop_id}/foods')
+    payload = resp.get_json()
+    assert payload['rows'][0][1:4] == ['Rice', None, 4]
+    assert payload['rows'][0][4] == '/static/img/food-rice.png'
+    assert client.get(f'/api/shops/{shop_id}/foods',
+                      headers={'If-None-Match': resp.headers['ETag']}).status_code == 304
+    assert client.get('/api/shops/999/foods').status_code == 404
+
+
+def test_bbox_body_follows_etag_after_shop_added_elsewhere(test_app, client):
+    with test_app.app_context():
+        seed_shop()
+    url = '/api/shops?bbox=24.9,121.4,25.1,121.6'
+    first = client.get(url)
+    assert len(first.get_json()['rows']) == 1
+
+    with test_app.app_context():
+        # 模擬另一個 worker 新增商家：資料庫有了，本行程的空間索引沒有收到 add_shop
+        db.session.add(Shop(name="Elsewhere", manager_email="else@test.com", latitude=25.01, longitude=121.51))
+        db.session.commit()
+    second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert sorted(row[1] for row in second.get_json()['rows']) == ['Elsewhere', 'Quote "Shop" </script>']
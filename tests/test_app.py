@@ -2,28 +2,11 @@ import os
 import sys
 from datetime import datetime, timedelta
 
-import pytest
-
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app, db
+from app import db
 from models import User, Shop, Food, Order
-
-
-@pytest.fixture
-def test_app():
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.session.remove()
-        db.drop_all()
-
-
-@pytest.fixture
-def client(test_app):
-    return test_app.test_client()
+from queries import shop_listing, shop_page
 
 
 def create_shop():
@@ -63,6 +46,58 @@ def test_shop_available_quantity_only_counts_active(test_app):
         assert shop.available_quantity == 5
 
 
+def test_shop_listing_preloads_remaining_quantity(test_app):
+    with test_app.app_context():
+        shop = create_shop()
+        empty_shop = Shop(name="Empty Shop", manager_email="empty@test.com")
+        db.session.add_all([
+            empty_shop,
+            Food(shop_id=shop.id, name="Bread", quantity=3, is_active=True),
+            Food(shop_id=shop.id, name="Rice", quantity=4, is_active=True),
+            Food(shop_id=shop.id, name="Hidden", quantity=9, is_active=False),
+        ])
+        db.session.commit()
+        db.session.expunge_all()
+
+        shops = shop_listing().all()
+        assert [s.remaining_quantity for s in shops] == [7, 0]
+        assert [s.available_quantity for s in shops] == [7, 0]
+
+
+def test_shop_page_walks_keyset_cursor_by_supply_and_distance(test_app, client):
+    with test_app.app_context():
+        for idx, qty in enumerate([5, 9, 0, 9, 2]):
+            shop = Shop(name=f"Shop {idx}", manager_email=f"s{idx}@test.com",
+                        latitude=25.0 + idx * 0.01, longitude=121.5)
+            db.session.add(shop)
+            db.session.flush()
+            db.session.add(Food(shop_id=shop.id, name="Meal", quantity=qty, is_active=True))
+        db.session.add(Shop(name="No Location", manager_email="nowhere@test.com"))
+        db.session.commit()
+
+        def walk(**kwargs):
+            names, cursor = [], None
+            while True:
+                shops, cursor = shop_page(cursor=cursor, limit=2, **kwargs)
+                names.extend(shop.name for shop in shops)
+                if not cursor:
+                    return names
+
+        assert walk(sort='supply') == ["Shop 1", "Shop 3", "Shop 0", "Shop 4", "Shop 2", "No Location"]
+        assert walk(sort='distance', lat=25.031, lng=121.5) == [
+            "Shop 3", "Shop 4", "Shop 2", "Shop 1", "Shop 0", "No Location"
+        ]
+
+    test_app.config['SHOP_PAGE_SIZE'] = 4
+    try:
+        first = client.get('/?sort=supply')
+    finally:
+        test_app.config['SHOP_PAGE_SIZE'] = 24
+    assert first.status_code == 200
+    assert first.data.count(b'class="card h-100 border-0 shadow-sm shop-card"') == 4
+    assert b'btn-load-more' in first.data
+
+
 def test_checkout_flow_creates_order_and_updates_inventory(test_app, client):
     pickup_time = (datetime.now() + timedelta(hours=1)).strftime('%H:%M')
 
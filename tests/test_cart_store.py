@@ -0,0 +1,58 @@
+import time
+
+from app import db
+from cart_store import MemoryCartStore, SQLCartStore
+from models import User, Shop, Food
+
+
+def test_memory_cart_store_evicts_lru_and_expires():
+    store = MemoryCartStore(maxsize=2, ttl=0.05)
+    store.save(1, {'shop_id': 1, 'items': {'1': 2}})
+    store.save(2, {'shop_id': 1, 'items': {'2': 1}})
+    store.get(1)
+    store.save(3, {'shop_id': 2, 'items': {'3': 1}})
+    assert store.get(2) == {}
+    assert store.get(1)['items'] == {'1': 2}
+
+    store.get(1)['items']['1'] = 99
+    assert store.get(1)['items'] == {'1': 2}
+
+    time.sleep(0.06)
+    assert store.get(1) == {}
+
+
+def test_sql_cart_store_round_trip_and_purge(test_app):
+    with test_app.app_context():
+        user = User(name="Cart User", email="cart@test.com")
+        db.session.add(user)
+        db.session.commit()
+
+        store = SQLCartStore(ttl=3600)
+        store.save(user.id, {'shop_id': 5, 'items': {'7': 3}})
+        assert store.get(user.id) == {'shop_id': 5, 'items': {'7': 3}}
+        assert store.purge_expired() == 0
+
+        store.ttl = -1
+        assert store.get(user.id) == {}
+        assert store.purge_expired() == 1
+
+
+def test_cart_is_not_kept_in_session_cookie(test_app, client):
+    with test_app.app_context():
+        user = User(name="Shopper", email="shopper@test.com")
+        user.set_password('pw')
+        shop = Shop(name="Cookie Shop", manager_email="cookie@test.com")
+        db.session.add_all([user, shop])
+        db.session.flush()
+        food = Food(shop_id=shop.id, name="Bun", quantity=5, is_active=True)
+        db.session.add(food)
+        db.session.commit()
+        food_id = food.id
+
+    client.post('/login', data={'email': 'shopper@test.com', 'password': 'pw'})
+    client.post('/cart/add', data={'food_id': food_id, 'quantity': 2})
+
+    with client.session_transaction() as sess:
+        assert 'cart' not in sess
+    resp = client.get('/checkout')
+    assert b'Bun' in resp.data
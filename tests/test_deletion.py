@@ -0,0 +1,82 @@
+from datetime import date, datetime, timedelta
+
+from analytics import shop_analytics
+from app import db
+from deletion import delete_shops, delete_user
+from models import User, Shop, Food, Order, OrderItem, Cart, ShopDailyStat
+
+
+def seed_orders(owner, customer, orders):
+    shop = Shop(name="Bakery", manager_email="bakery@test.com", owner=owner)
+    db.session.add(shop)
+    db.session.flush()
+    food = Food(shop_id=shop.id, name="Bread", quantity=10, is_active=True)
+    db.session.add(food)
+    db.session.flush()
+    pickup = datetime.now() + timedelta(hours=1)
+    for _ in range(orders):
+        order = Order(user_id=customer.id, shop_id=shop.id, pickup_time=pickup, status='pending')
+        db.session.add(order)
+        db.session.add(OrderItem(order=order, food_id=food.id, quantity=1))
+    db.session.commit()
+    return shop.id
+
+
+def make_users():
+    owner = User(name="Owner", email="owner@test.com", role="shop")
+    customer = User(name="Customer", email="customer@test.com")
+    db.session.add_all([owner, customer])
+    db.session.commit()
+    return owner, customer
+
+
+def test_delete_shops_uses_constant_statements(test_app, count_queries):
+    with test_app.app_context():
+        owner, customer = make_users()
+        shop_id = seed_orders(owner, customer, 25)
+        with count_queries() as statements:
+            counts = delete_shops([shop_id])
+        db.session.commit()
+        # 五個 DELETE 加上兩個統計更新，與訂單數量無關
+        assert len(statements) == 7
+        assert counts == {'order_items': 25, 'orders': 25, 'foods': 1, 'shop_daily_stats': 0, 'shops': 1}
+        assert db.session.query(Order).count() == 0
+        assert db.session.query(OrderItem).count() == 0
+
+
+def test_delete_user_removes_orders_cart_and_owned_shop(test_app):
+    with test_app.app_context():
+        owner, customer = make_users()
+        seed_orders(owner, customer, 3)
+        other_shop = Shop(name="Cafe", manager_email="cafe@test.com")
+        db.session.add(other_shop)
+        db.session.add(Cart(user_id=customer.id, data={}))
+        db.session.commit()
+
+        counts = delete_user(customer.id)
+        db.session.commit()
+        assert counts['orders'] == 3 and counts['order_items'] == 3 and counts['carts'] == 1
+        assert db.session.query(User).count() == 1
+
+        counts = delete_user(owner.id)
+        db.session.commit()
+        assert counts['shops'] == 1 and counts['users'] == 1
+        assert [shop.name for shop in Shop.query.all()] == ["Cafe"]
+
+
+def test_delete_user_drops_cached_analytics_days(test_app):
+    with test_app.app_context():
+        owner, customer = make_users()
+        shop_id = seed_orders(owner, customer, 2)
+        day = date.today() - timedelta(days=3)
+        db.session.query(Order).update({'status': 'completed',
+                                        'pickup_time': datetime.combine(day, datetime.min.time())})
+        db.session.commit()
+        window = (shop_id, day, day + timedelta(days=1))
+        assert shop_analytics(*window)['totals']['orders'] == 2
+        assert ShopDailyStat.query.count() == 1
+
+        counts = delete_user(customer.id)
+        db.session.commit()
+        assert counts['shop_daily_stats'] == 1
+        assert shop_analytics(*window)['totals']['orders'] == 0
@@ -0,0 +1,30 @@
+from sqlalchemy import text
+
+from app import create_app, db
+from engine_profiles import engine_options
+
+
+def pragmas(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            return {name: conn.execute(text(f'PRAGMA {name}')).scalar()
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size')}
+
+
+def test_tuned_profile_sets_sqlite_pragmas_on_connect(tmp_path):
+    tuned = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "tuned.db"}'})
+    assert pragmas(tuned) == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+                              'mmap_size': 256 * 1024 * 1024}
+
+    default = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "default.db"}', 'DB_PROFILE': 'default'})
+    assert pragmas(default)['journal_mode'] == 'delete'
+
+
+def test_postgres_profile_sizes_pool_and_sets_statement_timeout():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    options = engine_options(app.config, 'postgresql://user:pw@localhost/foodbank')
+    assert options['pool_size'] == 10 and options['max_overflow'] == 20
+    assert options['pool_pre_ping'] and options['pool_recycle'] == 1800
+    assert options['connect_args'] == {'options': '-c statement_timeout=15000'}
+    assert engine_options({**app.config, 'DB_PROFILE': 'default'}, 'postgresql://localhost/foodbank') == {}
+    assert engine_options(app.config) == {}
@@ -0,0 +1,80 @@
+import io
+from datetime import datetime, timedelta
+
+from app import db
+from food_io import iter_records, import_foods, inventory_csv
+from models import User, Shop, Food, Order, OrderItem
+
+
+def seed_shops():
+    owner = User(name="Owner", email="owner@test.com", role='shop')
+    owner.set_password('pw')
+    shop = Shop(name="Bakery", manager_email="owner@test.com", owner=owner)
+    other = Shop(name="Cafe", manager_email="cafe@test.com")
+    db.session.add_all([owner, shop, other])
+    db.session.flush()
+    mine = Food(shop_id=shop.id, name="Bread", quantity=1, is_active=True)
+    theirs = Food(shop_id=other.id, name="Latte", quantity=1, is_active=True)
+    db.session.add_all([mine, theirs])
+    db.session.commit()
+    return shop.id, mine.id, theirs.id
+
+
+def test_csv_import_creates_updates_and_reports_bad_rows(test_app, count_queries):
+    with test_app.app_context():
+        shop_id, mine, theirs = seed_shops()
+        rows = ["name,category,quantity,expiry_time,id"]
+        rows += [f"Meal {i},Hot,{i},2030-01-01," for i in range(25)]
+        rows += [",Hot,3,,", "Soup,Hot,-1,,", "Rice,Hot,2,tomorrow,", f",,9,,{mine}", f",,9,,{theirs}"]
+        upload = io.BytesIO("\n".join(rows).encode())
+
+        with count_queries() as statements:
+            result = import_foods(shop_id, iter_records(upload, 'csv'), chunk_size=10)
+        db.session.commit()
+
+        assert (result.created, result.updated, result.skipped) == (25, 1, 4)
+        assert result.errors == [(27, 'name'), (28, 'quantity'), (29, 'expiry'), (31, 'unknown_id')]
+        # 25 筆新增分三批寫入，加上一次更新、一次檢查 id 與一次版本號更新
+        assert len(statements) == 6
+        assert db.session.get(Food, mine).quantity == 9
+        assert db.session.get(Food, theirs).quantity == 1
+        assert Food.query.filter_by(shop_id=shop_id, category='Hot').count() == 25
+
+
+def test_json_lines_and_array_import(test_app):
+    with test_app.app_context():
+        shop_id, _, _ = seed_shops()
+        lines = b'{"name": "Bagel", "quantity": 4}\n\nnot json\n{"name": "Donut", "quantity": "2"}\n'
+        result = import_foods(shop_id, iter_records(io.BytesIO(lines), 'json'))
+        assert (result.created, result.errors) == (2, [(3, 'format')])
+        array = b'[{"name": "Scone", "quantity": 1}, {"name": "Muffin", "quantity": 1}]'
+        assert import_foods(shop_id, iter_records(io.BytesIO(array), 'json')).created == 2
+
+
+def test_exports_stream_csv_and_round_trip(test_app, client):
+    with test_app.app_context():
+        shop_id, mine, _ = seed_shops()
+        customer = User(name="Customer", email="customer@test.com")
+        db.session.add(customer)
+        db.session.flush()
+        order = Order(user_id=customer.id, shop_id=shop_id, pickup_time=datetime.now() + timedelta(hours=1),
+                      status='completed')
+        db.session.add(order)
+        db.session.add(OrderItem(order=order, food_id=mine, quantity=2))
+        db.session.commit()
+        exported = ''.join(inventory_csv(shop_id)).replace(',1,', ',7,')
+        result = import_foods(shop_id, iter_records(io.BytesIO(exported.encode()), 'csv'))
+        db.session.commit()
+        assert (result.created, result.updated) == (0, 1)
+        assert db.session.get(Food, mine).quantity == 7
+
+    client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+    resp = client.get('/shop/orders/export.csv')
+    assert resp.is_streamed and resp.mimetype == 'text/csv'
+    lines = resp.get_data(as_text=True).splitlines()
+    assert lines[0].startswith('order_id,pickup_time,status,customer')
+    assert len(lines) == 2 and 'Customer,' in lines[1]
+
+    resp = client.post('/shop/foods/import', data={'file': (io.BytesIO(b'name,quantity\nPie,3\n'), 'foods.csv')},
+                       content_type='multipart/form-data', follow_redirects=True)
+    assert 'Imported 1 new items' in resp.get_data(as_text=True)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from app import db
+from models import User, Shop, Food
+
+
+def seed_shop():
+    customer = User(name="Customer", email="customer@test.com")
+    customer.set_password('pw')
+    shop = Shop(name="Cached Shop", manager_email="cached@test.com",
+                closing_time=datetime.strptime("23:59", "%H:%M").time())
+    db.session.add_all([customer, shop])
+    db.session.flush()
+    food = Food(shop_id=shop.id, name="Dumplings", quantity=5, is_active=True)
+    db.session.add(food)
+    db.session.commit()
+    return shop.id, food.id
+
+
+def test_shop_detail_food_list_is_cached_until_stock_changes(test_app, client, count_queries):
+    fragment_cache = test_app.extensions['fragment_cache']
+    with test_app.app_context():
+        shop_id, food_id = seed_shop()
+
+    first = client.get(f'/shops/{shop_id}')
+    assert b'Dumplings' in first.data
+    with count_queries() as statements:
+        client.get(f'/shops/{shop_id}')
+    assert not any('FROM foods' in sql for sql in statements)
+
+    client.post('/login', data={'email': 'customer@test.com', 'password': 'pw'})
+    client.post('/cart/add', data={'food_id': food_id, 'quantity': 2})
+    pickup = (datetime.now() + timedelta(minutes=5)).strftime('%H:%M')
+    client.post('/checkout', data={'pickup_time': pickup})
+
+    with count_queries() as statements:
+        after = client.get(f'/shops/{shop_id}')
+    assert any('FROM foods' in sql for sql in statements)
+    assert b'max="3"' in after.data
+
+
+def test_shop_cards_are_keyed_by_language(test_app, client):
+    fragment_cache = test_app.extensions['fragment_cache']
+    with test_app.app_context():
+        seed_shop()
+
+    english = client.get('/')
+    client.get('/lang/zh')
+    chinese = client.get('/')
+    assert b'Remaining' in english.data
+    assert '剩餘'.encode() in chinese.data
+    assert len(fragment_cache) == 2
@@ -0,0 +1,85 @@
+import random
+from datetime import time
+
+from sqlalchemy import event
+
+from app import db
+from geo import GridIndex, haversine_km, is_open, shop_index
+from models import Shop, Food
+
+
+def test_grid_index_nearest_matches_brute_force():
+    rng = random.Random(7)
+    points = [(i, 24.9 + rng.random() * 0.3, 121.4 + rng.random() * 0.3) for i in range(2000)]
+    grid = GridIndex()
+    grid.build(points)
+
+    for _ in range(20):
+        lat, lng = 24.9 + rng.random() * 0.3, 121.4 + rng.random() * 0.3
+        found = grid.iter_nearest(lat, lng)
+        nearest = [next(found)[1][0] for _ in range(10)]
+        expected = sorted(points, key=lambda p: haversine_km(lat, lng, p[1], p[2]))[:10]
+        assert nearest == [p[0] for p in expected]
+
+    box = (25.0, 121.5, 25.05, 121.55)
+    inside = sorted(entry[0] for entry in grid.within(*box))
+    assert inside == sorted(p[0] for p in points if box[0] <= p[1] <= box[2] and box[1] <= p[2] <= box[3])
+
+
+def test_is_open_handles_overnight_hours():
+    assert is_open(time(9), time(18), time(12))
+    assert not is_open(time(9), time(18), time(20))
+    assert is_open(time(18), time(2), time(1))
+    assert is_open(None, None, time(3))
+
+
+def test_nearest_api_skips_sold_out_and_tracks_new_shops(test_app, client):
+    with test_app.app_context():
+        near = Shop(name="Near Sold Out", manager_email="near@test.com", latitude=25.001, longitude=121.5)
+        far = Shop(name="Far Stocked", manager_email="far@test.com", latitude=25.02, longitude=121.5)
+        db.session.add_all([near, far])
+        db.session.flush()
+        db.session.add_all([
+            Food(shop_id=near.id, name="Gone", quantity=0, is_active=True),
+            Food(shop_id=far.id, name="Soup", quantity=3, is_active=True),
+        ])
+        db.session.commit()
+
+        resp = client.get('/api/shops/nearest?lat=25.0&lng=121.5&k=2&open=0')
+        assert [s['name'] for s in resp.get_json()['shops']] == ["Far Stocked"]
+
+        resp = client.get('/api/shops/nearest?lat=25.0&lng=121.5&k=2&open=0&stock=0')
+        assert [s['name'] for s in resp.get_json()['shops']] == ["Near Sold Out", "Far Stocked"]
+
+        newest = Shop(name="Newest", manager_email="new@test.com", latitude=25.0, longitude=121.5)
+        db.session.add(newest)
+        db.session.commit()
+        shop_index.add_shop(newest)
+        resp = client.get('/api/shops/within?bbox=24.99,121.49,25.005,121.51')
+        assert sorted(s['name'] for s in resp.get_json()['shops']) == ["Near Sold Out", "Newest"]
+
+
+def test_index_lock_is_not_held_during_queries(test_app):
+    with test_app.app_context():
+        for n in range(30):
+            shop = Shop(name=f"Shop {n}", manager_email=f"s{n}@test.com", latitude=25.0 + n * 0.001, longitude=121.5)
+            db.session.add(shop)
+            db.session.flush()
+            db.session.add(Food(shop_id=shop.id, name="Rice", quantity=n % 3, is_active=True))
+        db.session.commit()
+        shop_index.invalidate()
+
+        held = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            held.append(shop_index._lock.locked())
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            found = shop_index.nearest(25.0, 121.5, k=12)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        # 重新載入與庫存查詢都在鎖外執行
+        assert len(held) >= 2 and not any(held)
+        assert len(found) == 12
+        assert [distance for _, distance in found] == sorted(distance for _, distance in found)
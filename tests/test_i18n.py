@@ -0,0 +1,14 @@
+from i18n import compile_translations
+
+
+def test_compiled_translations_fall_back_and_format():
+    compiled = compile_translations({
+        'en': {'hello': 'Hello', 'greet': 'Hi {name}', 'only_en': 'English only'},
+        'zh': {'hello': '你好', 'greet': '嗨 {name}'},
+    })
+    zh = compiled['zh']
+    assert zh('hello') == '你好'
+    assert zh('only_en') == 'English only'
+    assert zh('greet', name='Amy') == '嗨 Amy'
+    assert zh('hello', unused=1) == '你好'
+    assert zh('missing') == 'missing'
@@ -0,0 +1,66 @@
+from flask import g
+
+from app import db
+from identity import identity_cache
+from models import User, Shop
+
+
+def make_owner():
+    admin = User(name="Admin", email="admin@test.com", role="admin")
+    admin.set_password('pw')
+    owner = User(name="Owner", email="owner@test.com", role="shop")
+    owner.set_password('pw')
+    shop = Shop(name="Bakery", manager_email="owner@test.com", owner=owner)
+    db.session.add_all([admin, owner, shop])
+    db.session.commit()
+    return owner.id, shop.id
+
+
+def forget_current_user():
+    # 測試用 client 共用同一個 app context，先丟掉上一個請求留下的 current_user
+    g.pop('_login_user', None)
+
+
+def test_authenticated_requests_skip_user_lookup(test_app, client, count_queries):
+    with test_app.app_context():
+        owner_id, shop_id = make_owner()
+        identity_cache.clear()
+        client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+
+        with count_queries() as statements:
+            forget_current_user()
+            resp = client.get('/shop/analytics?days=7')
+        assert resp.status_code == 200
+        assert not [s for s in statements if 'FROM users' in s], statements
+
+        identity = identity_cache.load(owner_id)
+        assert (identity.role, identity.name, identity.shop_id) == ('shop', 'Owner', shop_id)
+
+
+def test_account_update_and_shop_delete_invalidate(test_app, client):
+    with test_app.app_context():
+        owner_id, shop_id = make_owner()
+        client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+        forget_current_user()
+        client.post('/account', data={'name': 'Renamed', 'phone': '0912345678'})
+        assert identity_cache.load(owner_id).name == 'Renamed'
+
+        client.get('/logout')
+        client.post('/login', data={'email': 'admin@test.com', 'password': 'pw'})
+        forget_current_user()
+        client.post(f'/admin/shops/{shop_id}/delete')
+        assert db.session.get(Shop, shop_id) is None
+        assert identity_cache.load(owner_id).shop_id is None
+
+
+def test_ttl_zero_disables_cache(test_app):
+    with test_app.app_context():
+        owner_id, _ = make_owner()
+        identity_cache.clear()
+        ttl = identity_cache._cache.ttl
+        identity_cache._cache.ttl = 0
+        try:
+            identity_cache.load(owner_id)
+            assert len(identity_cache) == 0
+        finally:
+            identity_cache._cache.ttl = ttl
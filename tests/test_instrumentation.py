@@ -0,0 +1,72 @@
+import json
+import logging
+
+import pytest
+
+from app import create_app, db
+from instrumentation import metrics
+from models import User, Shop
+
+
+@pytest.fixture
+def instrumented():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'INSTRUMENTATION': True})
+    metrics.reset()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    metrics.reset()
+
+
+def test_server_timing_header_log_line_and_histogram(instrumented, caplog):
+    with caplog.at_level(logging.INFO, logger='instrumentation'):
+        resp = instrumented.test_client().get('/')
+    timing = resp.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and 'tpl;dur=' in timing and 'app;dur=' in timing
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['endpoint'] == 'public.index' and record['queries'] >= 1 and record['template_ms'] > 0
+    assert record['n_plus_one'] == []
+    snapshot = metrics.snapshot()['public.index']
+    assert snapshot['count'] == 1 and sum(snapshot['histogram'].values()) == 1
+
+
+def test_repeated_statements_are_flagged_as_n_plus_one(instrumented, caplog):
+    with instrumented.app_context():
+        db.session.add_all(Shop(name=f"Shop {i}", manager_email=f"s{i}@test.com") for i in range(6))
+        db.session.commit()
+        ids = [shop.id for shop in Shop.query.all()]
+        db.session.expunge_all()
+        with caplog.at_level(logging.INFO, logger='instrumentation'), instrumented.test_request_context('/fake'):
+            instrumented.preprocess_request()
+            for shop_id in ids:
+                db.session.get(Shop, shop_id)
+            instrumented.process_response(instrumented.make_response('ok'))
+    record = json.loads(caplog.records[-1].getMessage())
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert record['n_plus_one'][0]['count'] == 6
+
+
+def make_admin():
+    admin = User(name="Admin", email="admin@test.com", role='admin')
+    admin.set_password('pw')
+    db.session.add(admin)
+    db.session.commit()
+
+
+def test_metrics_endpoint_is_admin_only_and_opt_in(test_app, client):
+    with test_app.app_context():
+        make_admin()
+    client.post('/login', data={'email': 'admin@test.com', 'password': 'pw'})
+    assert client.get('/admin/metrics').status_code == 404
+    assert 'Server-Timing' not in client.get('/').headers
+
+
+def test_metrics_endpoint_lists_instrumented_requests(instrumented):
+    make_admin()
+    client = instrumented.test_client()
+    assert client.get('/admin/metrics').status_code == 302
+    client.post('/login', data={'email': 'admin@test.com', 'password': 'pw'})
+    client.get('/')
+    assert 'public.index' in client.get('/admin/metrics').get_json()
@@ -0,0 +1,129 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func
+
+from app import create_app, db
+from inventory import place_order, reserve_stock, cancel_orders, cancel_no_shows, ReservationConflict
+from models import User, Shop, Food, Order, OrderItem
+
+
+def seed_food(quantity):
+    shop = Shop(name="Bakery", manager_email="bakery@test.com")
+    db.session.add(shop)
+    db.session.flush()
+    food = Food(shop_id=shop.id, name="Leftover Bread", quantity=quantity, is_active=True)
+    db.session.add(food)
+    db.session.commit()
+    return shop.id, food.id
+
+
+def test_reserve_stock_partially_fills_and_never_goes_negative(test_app):
+    with test_app.app_context():
+        _, food_id = seed_food(3)
+        assert reserve_stock(food_id, 2) == 2
+        assert reserve_stock(food_id, 5) == 1
+        assert reserve_stock(food_id, 1) == 0
+        db.session.commit()
+        assert db.session.get(Food, food_id).quantity == 0
+
+
+def test_concurrent_checkouts_never_oversell(tmp_path):
+    # 需要真正的併發交易：:memory: 資料庫在所有執行緒間共用同一條連線，這裡改用檔案
+    test_app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "inventory.db"}'})
+    stock, workers, per_order = 30, 16, 3
+    with test_app.app_context():
+        db.create_all()
+        shop_id, food_id = seed_food(stock)
+        users = [User(name=f"User {i}", email=f"u{i}@test.com") for i in range(workers)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+    pickup = datetime.now() + timedelta(hours=1)
+    booked, conflicts = [], []
+    start = threading.Barrier(workers)
+
+    def checkout(user_id):
+        with test_app.app_context():
+            start.wait()
+            try:
+                order, fills = place_order(user_id, shop_id, pickup, {str(food_id): per_order}, attempts=20)
+                booked.append(sum(fill.booked for fill in fills) if order else 0)
+            except ReservationConflict:
+                conflicts.append(user_id)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=checkout, args=(uid,)) for uid in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with test_app.app_context():
+        remaining = db.session.get(Food, food_id).quantity
+        ordered = db.session.query(func.coalesce(func.sum(OrderItem.quantity), 0)).scalar()
+        assert remaining >= 0
+        assert ordered == sum(booked) == stock - remaining
+        if not conflicts:
+            assert remaining == 0
+
+
+def place_orders(shop_id, food_id, count, pickup):
+    user = User(name="Customer", email="customer@test.com")
+    db.session.add(user)
+    db.session.commit()
+    return [place_order(user.id, shop_id, pickup, {str(food_id): 1})[0].id for _ in range(count)]
+
+
+def test_cancel_orders_restocks_in_constant_statements(test_app, count_queries):
+    with test_app.app_context():
+        shop_id, food_id = seed_food(20)
+        order_ids = place_orders(shop_id, food_id, 10, datetime.now() + timedelta(hours=1))
+        with count_queries() as statements:
+            cancelled = cancel_orders(order_ids)
+        db.session.commit()
+        assert sorted(cancelled) == sorted(order_ids)
+        assert len(statements) <= 4
+        assert db.session.get(Food, food_id).quantity == 20
+        # 已取消的訂單不會被重複補回庫存
+        assert cancel_orders(order_ids) == []
+        db.session.commit()
+        assert db.session.get(Food, food_id).quantity == 20
+
+
+def test_cancel_no_shows_only_touches_overdue_pending_orders(test_app):
+    with test_app.app_context():
+        shop_id, food_id = seed_food(10)
+        overdue = place_orders(shop_id, food_id, 3, datetime.now() - timedelta(hours=1))
+        db.session.query(Order).filter(Order.id == overdue[0]).update({'status': 'completed'})
+        upcoming = place_order(db.session.query(User.id).scalar(), shop_id,
+                               datetime.now() + timedelta(hours=1), {str(food_id): 1})[0].id
+        assert sorted(cancel_no_shows(shop_id)) == sorted(overdue[1:])
+        db.session.commit()
+        assert db.session.get(Order, upcoming).status == 'pending'
+        assert db.session.get(Order, overdue[0]).status == 'completed'
+        assert db.session.get(Food, food_id).quantity == 8
+
+
+def test_cancel_without_returning_only_restocks_claimed_orders(test_app, monkeypatch):
+    with test_app.app_context():
+        shop_id, food_id = seed_food(20)
+        order_ids = place_orders(shop_id, food_id, 3, datetime.now() + timedelta(hours=1))
+        monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+        stolen = [order_ids[0]]
+
+        def concurrent_cancel(conn, cursor, statement, parameters, context, executemany):
+            # 在 SELECT 與認領之間，另一個請求先取消了第一筆訂單
+            if stolen and statement.startswith('SELECT') and 'FROM orders' in statement:
+                cursor.connection.execute("UPDATE orders SET status = 'cancelled' WHERE id = ?", (stolen.pop(),))
+
+        event.listen(db.engine, 'after_cursor_execute', concurrent_cancel)
+        try:
+            cancelled = cancel_orders(order_ids)
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', concurrent_cancel)
+        db.session.commit()
+        assert sorted(cancelled) == sorted(order_ids[1:])
+        assert db.session.get(Food, food_id).quantity == 19
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from models import User, Shop, Order
+from queries import order_queue
+
+TODAY = date(2026, 5, 10)
+
+
+def seed():
+    user = User(name="Customer", email="customer@test.com")
+    shop = Shop(name="Bakery", manager_email="bakery@test.com")
+    db.session.add_all([user, shop])
+    db.session.flush()
+    noon = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=12)
+    for hours, status in [(-30, 'pending'), (-2, 'pending'), (-1, 'completed'), (0, 'pending'),
+                          (0, 'pending'), (1, 'cancelled'), (3, 'pending'), (30, 'pending')]:
+        db.session.add(Order(user_id=user.id, shop_id=shop.id, pickup_time=noon + timedelta(hours=hours),
+                             status=status))
+    db.session.commit()
+    return shop.id
+
+
+def walk(shop_id, **kwargs):
+    pages, cursor = [], None
+    while True:
+        orders, cursor = order_queue(shop_id, cursor=cursor, limit=2, today=TODAY, **kwargs)
+        pages.append([(order.pickup_time.hour, order.status) for order in orders])
+        if not cursor:
+            return pages
+
+
+def test_order_queue_filters_and_pages_by_pickup_time(test_app):
+    with test_app.app_context():
+        shop_id = seed()
+        assert walk(shop_id) == [[(10, 'pending'), (12, 'pending')], [(12, 'pending'), (15, 'pending')]]
+        assert walk(shop_id, status='all', window='upcoming') == [
+            [(10, 'pending'), (11, 'completed')], [(12, 'pending'), (12, 'pending')],
+            [(13, 'cancelled'), (15, 'pending')], [(18, 'pending')]]
+        # 過去的訂單由新到舊
+        assert walk(shop_id, window='past') == [[(6, 'pending')]]
+        assert walk(shop_id, status='completed', window='all') == [[(11, 'completed')]]
+
+
+def test_shop_dashboard_shows_one_page_with_next_link(test_app, client):
+    with test_app.app_context():
+        owner = User(name="Owner", email="owner@test.com", role='shop')
+        owner.set_password('pw')
+        customer = User(name="Customer", email="customer@test.com")
+        shop = Shop(name="Bakery", manager_email="owner@test.com", owner=owner)
+        db.session.add_all([owner, customer, shop])
+        db.session.flush()
+        pickup = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=12)
+        db.session.add_all(Order(user_id=customer.id, shop_id=shop.id, pickup_time=pickup, status='pending')
+                           for _ in range(5))
+        db.session.commit()
+    client.post('/login', data={'email': 'owner@test.com', 'password': 'pw'})
+
+    test_app.config['ORDER_PAGE_SIZE'] = 3
+    try:
+        page = client.get('/shop/dashboard').get_data(as_text=True)
+        assert page.count('name="status" class="form-select form-select-sm"') == 4
+        assert 'cursor=' in page
+        page = client.get('/shop/dashboard?status=completed').get_data(as_text=True)
+        assert 'cursor=' not in page
+    finally:
+        test_app.config['ORDER_PAGE_SIZE'] = 20
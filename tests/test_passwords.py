@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from models import User
+from passwords import PasswordHasher, HashPoolBusy
+from throttle import TokenBuckets, login_throttle
+
+
+def test_full_pool_rejects_instead_of_queueing():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, queue=0)
+    release = threading.Event()
+    blocked = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocked.start()
+    try:
+        # 等背景執行緒佔住唯一的名額
+        while hasher._slots.acquire(blocking=False):
+            hasher._slots.release()
+        with pytest.raises(HashPoolBusy):
+            hasher.hash('secret')
+    finally:
+        release.set()
+        blocked.join()
+    assert hasher.verify(hasher.hash('secret'), 'secret')
+
+
+def test_login_upgrades_hash_after_method_change(test_app, client):
+    with test_app.app_context():
+        user = User(name="Old", email="old@test.com", password_hash=generate_password_hash('pw', 'pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+
+        resp = client.post('/login', data={'email': 'old@test.com', 'password': 'pw'})
+        assert resp.status_code == 302
+        db.session.expire_all()
+        user = User.query.filter_by(email='old@test.com').one()
+        assert user.password_hash.startswith('scrypt:')
+        assert not user.password_needs_rehash()
+        assert user.check_password('pw')
+
+
+def test_token_bucket_refills_over_time():
+    buckets = TokenBuckets(per_minute=60, burst=2)
+    assert buckets.take('k', now=0) and buckets.take('k', now=0)
+    assert not buckets.take('k', now=0.5)
+    assert buckets.take('k', now=1.6)
+
+
+def test_login_is_throttled_per_account(test_app, client):
+    with test_app.app_context():
+        user = User(name="Target", email="target@test.com")
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.commit()
+
+        burst = login_throttle.by_account.burst
+        for _ in range(burst):
+            assert client.post('/login', data={'email': 'target@test.com', 'password': 'wrong'}).status_code == 200
+        # 正確密碼也會被擋，直到桶子補回
+        resp = client.post('/login', data={'email': 'Target@test.com', 'password': 'pw'})
+        assert resp.status_code == 429
+        # 其他帳號不受影響
+        assert client.post('/login', data={'email': 'other@test.com', 'password': 'x'}).status_code == 200
+
+
+def test_login_ip_throttle_uses_forwarded_client_behind_proxy():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:', 'TRUSTED_PROXIES': 1,
+                      'LOGIN_IP_BURST': 2, 'LOGIN_IP_PER_MINUTE': 1})
+    with app.app_context():
+        db.create_all()
+        login_throttle.clear()
+        client = app.test_client()
+
+        def attempt(ip):
+            return client.post('/login', data={'email': f'{ip}@test.com', 'password': 'x'},
+                               headers={'X-Forwarded-For': ip}).status_code
+
+        # 所有請求都來自同一個代理 (127.0.0.1)，但依轉送的用戶端 IP 各自計算
+        assert [attempt('203.0.113.7') for _ in range(3)] == [200, 200, 429]
+        assert attempt('198.51.100.2') == 200
+        login_throttle.clear()
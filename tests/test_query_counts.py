@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from models import User, Shop, Food, Order, OrderItem
+from site_stats import refresh_stats
+
+# 每頁 SQL 數量上限：不論訂單/品項多少筆都不應超過
+MAX_STATEMENTS_PER_PAGE = 8
+
+
+def seed_orders(order_count):
+    customer = User(name="Customer", email="customer@test.com", role='user')
+    customer.set_password('pw')
+    owner = User(name="Owner", email="owner@test.com", role='shop')
+    owner.set_password('pw')
+    admin = User(name="Admin", email="admin@test.com", role='admin')
+    admin.set_password('pw')
+    shop = Shop(name="Busy Shop", manager_email="owner@test.com", owner=owner)
+    db.session.add_all([customer, owner, admin, shop])
+    db.session.flush()
+    foods = [Food(shop_id=shop.id, name=f"Food {i}", quantity=100, is_active=True) for i in range(3)]
+    db.session.add_all(foods)
+    db.session.flush()
+    pickup = datetime.now() + timedelta(hours=2)
+    for _ in range(order_count):
+        order = Order(user_id=customer.id, shop_id=shop.id, pickup_time=pickup, status='pending')
+        db.session.add(order)
+        for food in foods:
+            db.session.add(OrderItem(order=order, food_id=food.id, quantity=1))
+    refresh_stats()
+    db.session.commit()
+
+
+def login(client, email):
+    client.post('/login', data={'email': email, 'password': 'pw'})
+
+
+@pytest.mark.parametrize('order_count', [3, 40])
+@pytest.mark.parametrize('email, path', [
+    ('customer@test.com', '/orders'),
+    ('owner@test.com', '/shop/dashboard'),
+    ('admin@test.com', '/admin'),
+])
+def test_order_pages_use_bounded_statement_count(test_app, client, count_queries, order_count, email, path):
+    with test_app.app_context():
+        seed_orders(order_count)
+    login(client, email)
+
+    with count_queries() as statements:
+        resp = client.get(path)
+
+    assert resp.status_code == 200
+    assert len(statements) <= MAX_STATEMENTS_PER_PAGE, statements
@@ -0,0 +1,116 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from geo import shop_index
+from identity import identity_cache
+from models import User, Shop, Food, Order
+from replicas import PRIMARY_UNTIL
+from throttle import login_throttle
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+                      'DATABASE_REPLICA_URLS': [f'sqlite:///{replica}'], 'EXPIRY_SWEEP_INTERVAL': 0})
+    with app.app_context():
+        db.create_all()
+        shop_index.invalidate()
+        identity_cache.clear()
+        login_throttle.clear()
+        yield app, primary, replica
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # db 物件由所有測試共用；init_app 會為每個 bind 建立 metadata，留著會讓之後的 create_all() 找不到引擎
+    db.metadatas.pop('replica_0', None)
+
+
+def copy_to_replica(primary, replica):
+    # 以 SQLite backup 模擬副本同步
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+
+
+@contextmanager
+def replica_reads():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engines['replica_0']
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_reads_use_replica_until_own_write(replicated):
+    app, primary, replica = replicated
+    client = app.test_client()
+    user = User(name="Reader", email="reader@test.com")
+    user.set_password('pw')
+    shop = Shop(name="Old Shop", manager_email="old@test.com")
+    db.session.add_all([user, shop])
+    db.session.commit()
+    food = Food(shop_id=shop.id, name="Bread", quantity=5, is_active=True)
+    db.session.add(food)
+    db.session.commit()
+    copy_to_replica(primary, replica)
+    # 主資料庫上的新商家還沒同步到副本
+    late = Shop(name="Late Shop", manager_email="late@test.com")
+    db.session.add(late)
+    db.session.commit()
+    late_id, food_id = late.id, food.id
+    # 測試用 client 共用同一個 app context 與 session，先清掉已載入的物件
+    db.session.remove()
+
+    client.post('/login', data={'email': 'reader@test.com', 'password': 'pw'})
+    with replica_reads() as statements:
+        assert client.get(f'/shops/{late_id}').status_code == 404
+        assert client.get('/orders').status_code == 200
+    assert statements
+
+    pickup_time = (datetime.now() + timedelta(minutes=5)).strftime('%H:%M')
+    client.post('/cart/add', data={'food_id': food_id, 'quantity': 1})
+    assert client.post('/checkout', data={'pickup_time': pickup_time}).status_code == 302
+    with replica_reads() as statements:
+        assert client.get(f'/shops/{late_id}').status_code == 200
+        assert b'Bread' in client.get('/orders').data
+    assert statements == []
+    assert Order.query.count() == 1
+    db.session.remove()
+
+    # 時限過後回到副本讀取
+    with client.session_transaction() as session:
+        session[PRIMARY_UNTIL] = 0
+    with replica_reads() as statements:
+        assert client.get(f'/shops/{late_id}').status_code == 404
+    assert statements
+
+
+def test_writes_inside_read_only_view_go_to_primary(replicated):
+    app, primary, replica = replicated
+    client = app.test_client()
+    admin = User(name="Admin", email="admin@test.com", role="admin")
+    admin.set_password('pw')
+    db.session.add(admin)
+    db.session.commit()
+    # 副本有資料表但還沒有統計列；後台首頁要在主資料庫建立統計
+    copy_to_replica(primary, replica)
+
+    client.post('/login', data={'email': 'admin@test.com', 'password': 'pw'})
+    with client.session_transaction() as session:
+        session.pop(PRIMARY_UNTIL, None)
+    assert client.get('/admin').status_code == 200
+    with sqlite3.connect(primary) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM site_stats').fetchone()[0] > 0
+    with sqlite3.connect(replica) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM site_stats').fetchone()[0] == 0
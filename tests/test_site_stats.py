@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from app import db
+from deletion import delete_user
+from inventory import place_order
+from models import User, Shop, Food
+from site_stats import read_stats, refresh_stats
+
+
+def test_stats_follow_writes_without_recounting(test_app, client):
+    with test_app.app_context():
+        assert read_stats() == {'total_orders': 0, 'total_users': 0, 'total_shops': 0}
+
+    client.post('/register', data={'name': 'Amy', 'email': 'amy@test.com', 'phone': '0912345678',
+                                   'password': 'pw'})
+    client.post('/register/shop', data={'name': 'Bob', 'email': 'bob@test.com', 'phone': '0912345679',
+                                        'password': 'pw', 'shop_name': 'Bakery'})
+    with test_app.app_context():
+        shop = Shop.query.one()
+        food = Food(shop_id=shop.id, name="Bread", quantity=5, is_active=True)
+        db.session.add(food)
+        db.session.commit()
+        amy = User.query.filter_by(email='amy@test.com').one()
+        place_order(amy.id, shop.id, datetime.now() + timedelta(hours=1), {str(food.id): 2})
+        assert read_stats() == {'total_orders': 1, 'total_users': 1, 'total_shops': 1}
+
+        delete_user(shop.owner_id)
+        db.session.commit()
+        assert read_stats() == {'total_orders': 0, 'total_users': 1, 'total_shops': 0}
+        assert refresh_stats() == read_stats()
+
+
+def test_admin_tables_are_paginated_and_searchable(test_app, client):
+    with test_app.app_context():
+        admin = User(name="Admin", email="admin@test.com", role='admin')
+        admin.set_password('pw')
+        db.session.add(admin)
+        db.session.add_all(User(name=f"User {i}", email=f"user{i}@test.com") for i in range(7))
+        db.session.add_all(Shop(name=f"Shop {i}", manager_email=f"shop{i}@test.com") for i in range(7))
+        db.session.commit()
+    client.post('/login', data={'email': 'admin@test.com', 'password': 'pw'})
+
+    test_app.config['ADMIN_PAGE_SIZE'] = 5
+    try:
+        page = client.get('/admin').get_data(as_text=True)
+        assert 'user4@test.com' not in page and 'shop_after=5' in page and 'user_after=5' in page
+        page = client.get('/admin?user_after=5').get_data(as_text=True)
+        assert 'user4@test.com' in page and 'user_after=' not in page.replace('user_after=5', '')
+        page = client.get('/admin?user_q=USER6&shop_q=op 3').get_data(as_text=True)
+        assert 'user6@test.com' in page and 'user5@test.com' not in page
+        assert 'Shop 3' in page and 'Shop 4' not in page
+    finally:
+        test_app.config['ADMIN_PAGE_SIZE'] = 50
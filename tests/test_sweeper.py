@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from app import db
+from models import User, Shop, Food, Order, OrderItem
+from sweeper import ExpirySweeper
+
+
+def seed(now):
+    user = User(name="Customer", email="customer@test.com")
+    shop = Shop(name="Bakery", manager_email="bakery@test.com")
+    db.session.add_all([user, shop])
+    db.session.flush()
+    fresh = Food(shop_id=shop.id, name="Bread", quantity=5, is_active=True, expiry_time=now + timedelta(days=1))
+    stale = Food(shop_id=shop.id, name="Milk", quantity=4, is_active=True, expiry_time=now - timedelta(hours=1))
+    db.session.add_all([fresh, stale])
+    db.session.flush()
+    for hours in (-5, -4, -3, 2):
+        order = Order(user_id=user.id, shop_id=shop.id, pickup_time=now + timedelta(hours=hours), status='pending')
+        db.session.add(order)
+        db.session.add(OrderItem(order=order, food_id=fresh.id, quantity=1))
+    db.session.commit()
+    return shop.id, fresh.id, stale.id
+
+
+def test_sweep_cancels_overdue_orders_and_deactivates_expired_food(test_app):
+    now = datetime(2026, 5, 1, 12, 0)
+    with test_app.app_context():
+        shop_id, fresh_id, stale_id = seed(now)
+        sweeper = ExpirySweeper()
+        stats = sweeper.run(now=now, batch_size=2)
+
+        assert stats['orders_cancelled'] == 3
+        assert stats['foods_deactivated'] == 1
+        assert stats['batches'] == 3
+        assert db.session.query(Order).filter_by(status='pending').count() == 1
+        assert db.session.get(Food, fresh_id).quantity == 8
+        assert db.session.get(Food, stale_id).is_active is False
+        assert db.session.get(Shop, shop_id).stock_version > 0
+
+        # 第二次執行沒有工作可做
+        assert sweeper.run(now=now)['orders_cancelled'] == 0
+        assert sweeper.stats()['totals'] == {'runs': 2, 'orders_cancelled': 3, 'foods_deactivated': 1}
+
+
+def test_sweep_respects_pickup_grace(test_app):
+    now = datetime(2026, 5, 1, 12, 0)
+    with test_app.app_context():
+        seed(now)
+        stats = ExpirySweeper().run(now=now, grace=timedelta(hours=4, minutes=30))
+        assert stats['orders_cancelled'] == 1
@@ -0,0 +1,68 @@
+import threading
+import time
+from cache import LRUCache
+
+
+class TokenBuckets:
+    """In-memory token buckets keyed by any hashable value.
+
+    Each key holds up to ``burst`` tokens and regains ``per_minute`` tokens
+    a minute. Buckets live in a bounded LRU; an evicted bucket comes back
+    full, which only errs on the side of letting a request through.
+    """
+
+    def __init__(self, per_minute=10, burst=10, maxsize=100000):
+        self.per_minute = per_minute
+        self.burst = burst
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, now=None):
+        """Spend one token for ``key``; False when the bucket is empty."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.per_minute / 60)
+            allowed = tokens >= 1
+            self._buckets.set(key, (tokens - 1 if allowed else tokens, now))
+            return allowed
+
+    def reset(self, key):
+        self._buckets.pop(key)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class LoginThrottle:
+    """Per-IP and per-account limits on login attempts."""
+
+    def __init__(self):
+        self.by_ip = TokenBuckets()
+        self.by_account = TokenBuckets()
+
+    def init_app(self, app):
+        self.by_ip.per_minute = app.config['LOGIN_IP_PER_MINUTE']
+        self.by_ip.burst = app.config['LOGIN_IP_BURST']
+        self.by_account.per_minute = app.config['LOGIN_ACCOUNT_PER_MINUTE']
+        self.by_account.burst = app.config['LOGIN_ACCOUNT_BURST']
+
+    def allow(self, ip, account, now=None):
+        # 兩個桶都要扣：換帳號猜密碼會被 IP 限制擋下，分散 IP 猜同一帳號會被帳號限制擋下
+        by_ip = self.by_ip.take(ip, now)
+        by_account = self.by_account.take((account or '').strip().lower(), now)
+        return by_ip and by_account
+
+    def succeeded(self, account):
+        # 登入成功後清掉帳號的失敗紀錄，打錯幾次密碼的本人不會被鎖住
+        self.by_account.reset((account or '').strip().lower())
+
+    def clear(self):
+        self.by_ip.clear()
+        self.by_account.clear()
+
+
+login_throttle = LoginThrottle()
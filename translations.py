@@ -25,6 +25,10 @@ translations = {
         "label_sold_out": "Sold out",
         "badge_most_supply": "Most supplies",
         "badge_nearest": "Nearest",
+        "sort_supply": "Most supplies",
+        "sort_distance": "Nearest first",
+        "btn_load_more": "Load more",
+        "label_distance_km": "{km} km away",
         "btn_show_on_map": "Show on map",
         "btn_my_location": "My location",
         "btn_use_my_location": "Use my location",
@@ -109,11 +113,19 @@ translations = {
         "status_pending": "Pending",
         "status_completed": "Completed",
         "status_cancelled": "Cancelled",
+        "status_all": "All statuses",
+        "window_today": "Pickup today",
+        "window_upcoming": "Today and later",
+        "window_past": "Before today",
+        "window_all": "Any pickup time",
+        "btn_filter": "Filter",
         "flash_email_exists": "Email already registered.",
         "flash_register_success": "Registration successful, welcome!",
         "flash_shop_register_success": "Shop registered. Start listing foods!",
         "flash_login_success": "Logged in successfully.",
         "flash_login_failed": "Invalid email or password.",
+        "flash_login_throttled": "Too many login attempts. Please wait a minute and try again.",
+        "error_server_busy": "The server is busy. Please try again in a few seconds.",
         "flash_logout": "Logged out.",
         "flash_cart_conflict": "Cart already holds another shop. Please checkout or clear it first.",
         "flash_item_added": "{name} added to cart.",
@@ -123,6 +135,9 @@ translations = {
         "flash_pickup_future": "Pickup time must be in the future.",
         "flash_pickup_hours": "Pickup time must be within shop hours.",
         "flash_booking_success": "Booking confirmed!",
+        "flash_partial_fill": "Only {booked} of {requested} × {name} were still available and have been booked.",
+        "flash_items_sold_out": "Sorry, these items were just reserved by someone else.",
+        "flash_checkout_busy": "Many people are booking right now. Please try again.",
         "flash_forbidden_order": "You cannot view this order.",
         "flash_order_completed": "Completed orders cannot be cancelled.",
         "flash_order_cancelled": "Order cancelled.",
@@ -134,10 +149,32 @@ translations = {
         "flash_invalid_status": "Invalid status.",
         "flash_cannot_update_cancelled": "Cancelled orders cannot change status.",
         "flash_status_updated": "Order status updated.",
+        "btn_import_foods": "Import CSV / JSON",
+        "btn_export_inventory": "Export inventory",
+        "btn_export_orders": "Export orders",
+        "import_help": "Columns: name, category, quantity, expiry_time, description, photo_url. Rows with an id update that item's quantity.",
+        "flash_import_no_file": "Please choose a file to import.",
+        "flash_import_failed": "The file could not be read. Nothing was imported.",
+        "flash_import_done": "Imported {created} new items and updated {updated}; {skipped} rows skipped.",
+        "flash_import_error": "Line {line}: {reason}",
+        "import_error_format": "not a valid record",
+        "import_error_name": "name is required",
+        "import_error_quantity": "quantity must be a whole number of at least 0",
+        "import_error_expiry": "expiry_time must look like 2025-12-31 or 2025-12-31 18:00",
+        "import_error_unknown_id": "no item with this id in your shop",
+        "analytics_title": "Last 30 days",
+        "analytics_units": "Items picked up",
+        "analytics_completion_rate": "Pickup rate",
+        "analytics_no_show_rate": "No-show rate",
+        "analytics_day": "Day",
+        "analytics_orders": "Orders",
+        "flash_no_shows_cancelled": "Cancelled {count} overdue pending orders and restocked their items.",
+        "btn_cancel_no_shows": "Cancel no-shows",
         "flash_admin_only": "Admins only.",
         "flash_shop_deleted": "Shop deleted.",
         "flash_cannot_delete_admin": "Cannot delete admin accounts.",
         "flash_user_deleted": "User deleted.",
+        "flash_rows_removed": "Removed {orders} orders, {items} order items and {foods} foods.",
         "flash_lang_switched": "Language switched.",
         "hero_logged_in_cta": "See nearby locations",
         "hero_logged_in_orders": "My bookings",
@@ -150,6 +187,11 @@ translations = {
         "admin_no_shops": "No shops found.",
         "admin_no_orders": "No orders yet.",
         "admin_no_users": "No users found.",
+        "admin_search_shops": "Search name or address",
+        "admin_search_users": "Search name or email",
+        "btn_search": "Search",
+        "btn_next_page": "Next page",
+        "btn_first_page": "First page",
         "label_distance": "Distance",
         "btn_language": "Language",
         "confirm_delete_shop": "Delete this shop?",
@@ -181,6 +223,10 @@ translations = {
         "label_sold_out": "已領完",
         "badge_most_supply": "物資最多",
         "badge_nearest": "最近據點",
+        "sort_supply": "物資最多",
+        "sort_distance": "距離最近",
+        "btn_load_more": "載入更多",
+        "label_distance_km": "距離 {km} 公里",
         "btn_show_on_map": "顯示在地圖上",
         "btn_my_location": "顯示我的位置",
         "btn_use_my_location": "使用我的位置",
@@ -265,11 +311,19 @@ translations = {
         "status_pending": "待取貨",
         "status_completed": "已取貨",
         "status_cancelled": "已取消",
+        "status_all": "全部狀態",
+        "window_today": "今天取貨",
+        "window_upcoming": "今天及之後",
+        "window_past": "今天以前",
+        "window_all": "不限取貨時間",
+        "btn_filter": "篩選",
         "flash_email_exists": "此 Email 已註冊。",
         "flash_register_success": "註冊成功，歡迎加入！",
         "flash_shop_register_success": "商家註冊成功，開始上架物資吧！",
         "flash_login_success": "登入成功。",
         "flash_login_failed": "帳號或密碼錯誤。",
+        "flash_login_throttled": "登入嘗試次數過多，請稍候一分鐘再試。",
+        "error_server_busy": "伺服器忙碌中，請稍後幾秒再試。",
         "flash_logout": "已登出。",
         "flash_cart_conflict": "購物車已包含其他商家，請先結帳或清空。",
         "flash_item_added": "{name} 已加入購物車。",
@@ -279,6 +333,9 @@ translations = {
         "flash_pickup_future": "取貨時間需晚於現在。",
         "flash_pickup_hours": "取貨時間不可超過營業時間。",
         "flash_booking_success": "預訂成功！",
+        "flash_partial_fill": "{name} 只剩 {booked} 份（您選了 {requested} 份），已為您預訂剩餘數量。",
+        "flash_items_sold_out": "抱歉，這些品項剛剛已被其他人預訂完。",
+        "flash_checkout_busy": "目前預訂人數眾多，請稍後再試。",
         "flash_forbidden_order": "無權查看此訂單。",
         "flash_order_completed": "已完成的訂單無法取消。",
         "flash_order_cancelled": "訂單已取消。",
@@ -290,10 +347,32 @@ translations = {
         "flash_invalid_status": "無效的狀態。",
         "flash_cannot_update_cancelled": "已取消的訂單無法更改狀態。",
         "flash_status_updated": "訂單狀態已更新。",
+        "btn_import_foods": "匯入 CSV / JSON",
+        "btn_export_inventory": "匯出庫存",
+        "btn_export_orders": "匯出訂單",
+        "import_help": "欄位：name, category, quantity, expiry_time, description, photo_url。含 id 的列會更新該食物的數量。",
+        "flash_import_no_file": "請選擇要匯入的檔案。",
+        "flash_import_failed": "無法讀取檔案，未匯入任何資料。",
+        "flash_import_done": "新增 {created} 項、更新 {updated} 項，略過 {skipped} 列。",
+        "flash_import_error": "第 {line} 列：{reason}",
+        "import_error_format": "不是有效的資料列",
+        "import_error_name": "缺少名稱",
+        "import_error_quantity": "數量必須是大於等於 0 的整數",
+        "import_error_expiry": "到期時間格式應為 2025-12-31 或 2025-12-31 18:00",
+        "import_error_unknown_id": "你的商家沒有這個 id 的食物",
+        "analytics_title": "最近 30 天",
+        "analytics_units": "已取貨數量",
+        "analytics_completion_rate": "取貨率",
+        "analytics_no_show_rate": "未到取比例",
+        "analytics_day": "日期",
+        "analytics_orders": "訂單數",
+        "flash_no_shows_cancelled": "已取消 {count} 筆逾期未取的訂單並補回庫存。",
+        "btn_cancel_no_shows": "取消逾期未取訂單",
         "flash_admin_only": "只有管理者可以存取。",
         "flash_shop_deleted": "商家已刪除。",
         "flash_cannot_delete_admin": "無法刪除管理者帳號。",
         "flash_user_deleted": "用戶已刪除。",
+        "flash_rows_removed": "共移除 {orders} 筆訂單、{items} 筆訂單品項與 {foods} 項食物。",
         "flash_lang_switched": "語言已切換。",
         "hero_logged_in_cta": "查看附近據點",
         "hero_logged_in_orders": "我的預訂",
@@ -306,6 +385,11 @@ translations = {
         "admin_no_shops": "尚無商家。",
         "admin_no_orders": "尚無訂單。",
         "admin_no_users": "尚無用戶。",
+        "admin_search_shops": "搜尋名稱或地址",
+        "admin_search_users": "搜尋姓名或 Email",
+        "btn_search": "搜尋",
+        "btn_next_page": "下一頁",
+        "btn_first_page": "第一頁",
         "label_distance": "距離",
         "btn_language": "語言",
         "confirm_delete_shop": "確定刪除此商家？",
@@ -0,0 +1,11 @@
+from views import public, shop, admin, api
+from views.common import resolve_translator, inject_translations
+
+BLUEPRINTS = (public.bp, shop.bp, admin.bp, api.bp)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+    app.before_request(resolve_translator)
+    app.context_processor(inject_translations)
@@ -0,0 +1,94 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, abort, jsonify
+from flask_login import current_user, login_required
+from extensions import db
+from models import User, Shop, Order
+from queries import order_loader_options, admin_page
+from geo import shop_index
+from deletion import delete_shops, delete_user
+from sweeper import sweeper
+from site_stats import read_stats
+from instrumentation import metrics
+from identity import identity_cache
+from replicas import read_only
+from views.common import user_is, translate, flash_removed
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@bp.route('')
+@login_required
+@read_only
+def dashboard():
+    if not user_is('admin'):
+        flash(translate('flash_admin_only'), 'danger')
+        return redirect(url_for('public.index'))
+    # 先讀統計：第一次讀取時會建立並提交統計表，不能讓它使後面載入的物件過期
+    stats = read_stats()
+    limit = current_app.config['ADMIN_PAGE_SIZE']
+    shop_q = request.args.get('shop_q', '').strip()
+    user_q = request.args.get('user_q', '').strip()
+    shops, shops_next = admin_page(Shop, [Shop.name, Shop.address], shop_q,
+                                   request.args.get('shop_after', type=int), limit)
+    users, users_next = admin_page(User, [User.name, User.email], user_q,
+                                   request.args.get('user_after', type=int), limit)
+    orders = Order.query.options(*order_loader_options()).order_by(Order.created_at.desc()).limit(20).all()
+    # 翻頁連結保留另一張表的搜尋與頁數
+    args = request.args.to_dict()
+    pages = {
+        'shops_next': url_for('admin.dashboard', **{**args, 'shop_after': shops_next}) if shops_next else None,
+        'shops_first': url_for('admin.dashboard', **{k: v for k, v in args.items() if k != 'shop_after'}),
+        'users_next': url_for('admin.dashboard', **{**args, 'user_after': users_next}) if users_next else None,
+        'users_first': url_for('admin.dashboard', **{k: v for k, v in args.items() if k != 'user_after'}),
+    }
+    return render_template('admin_dashboard.html', shops=shops, users=users, orders=orders, stats=stats,
+                           shop_q=shop_q, user_q=user_q, pages=pages)
+
+@bp.route('/sweeper')
+@login_required
+def sweeper_stats():
+    if not user_is('admin'):
+        abort(403)
+    return jsonify(sweeper.stats())
+
+@bp.route('/metrics', endpoint='metrics')
+@login_required
+def admin_metrics():
+    if not user_is('admin'):
+        abort(403)
+    if not current_app.config['INSTRUMENTATION']:
+        abort(404)
+    return jsonify(metrics.snapshot())
+
+@bp.route('/shops/<int:shop_id>/delete', methods=['POST'])
+@login_required
+def delete_shop(shop_id):
+    if not user_is('admin'):
+        abort(403)
+    shop = Shop.query.get_or_404(shop_id)
+    owner_id = shop.owner_id
+    counts = delete_shops([shop_id])
+    db.session.commit()
+    identity_cache.invalidate(owner_id)
+    shop_index.remove_shop(shop_id)
+    flash(translate('flash_shop_deleted'), 'info')
+    flash_removed(counts)
+    return redirect(url_for('admin.dashboard'))
+
+@bp.route('/users/<int:user_id>/delete', methods=['POST'], endpoint='delete_user')
+@login_required
+def admin_delete_user(user_id):
+    if not user_is('admin'):
+        abort(403)
+    user = User.query.get_or_404(user_id)
+    if user.id == current_user.id or user.role == 'admin':
+        flash(translate('flash_cannot_delete_admin'), 'warning')
+        return redirect(url_for('admin.dashboard'))
+    shop_id = user.shop.id if user.shop else None
+    counts = delete_user(user_id)
+    db.session.commit()
+    identity_cache.invalidate(user_id)
+    if shop_id:
+        shop_index.remove_shop(shop_id)
+    flash(translate('flash_user_deleted'), 'info')
+    flash_removed(counts)
+    return redirect(url_for('admin.dashboard'))
@@ -0,0 +1,108 @@
+import hashlib
+import json
+from datetime import datetime
+from flask import Blueprint, current_app, request, abort, jsonify
+from models import Shop, Food
+from queries import shop_listing, shops_fingerprint
+from geo import shop_index
+from views.common import resolve_photo
+
+bp = Blueprint('api', __name__, url_prefix='/api')
+
+
+def _shop_json(shop, distance_km=None):
+    data = {
+        'id': shop.id,
+        'name': shop.name,
+        'address': shop.address,
+        'lat': shop.latitude,
+        'lng': shop.longitude,
+        'remaining': shop.available_quantity,
+    }
+    if distance_km is not None:
+        data['distance_km'] = round(distance_km, 3)
+    return data
+
+def _shops_by_id(shop_ids):
+    if not shop_ids:
+        return {}
+    return {shop.id: shop for shop in shop_listing().filter(Shop.id.in_(shop_ids))}
+
+@bp.route('/shops/nearest')
+def nearest_shops():
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    if lat is None or lng is None:
+        abort(400)
+    k = max(1, min(request.args.get('k', 5, type=int), 50))
+    # 預設只回傳「目前營業中且還有物資」的商家，open=0 / stock=0 可關閉
+    at = datetime.now().time() if request.args.get('open', '1') != '0' else None
+    require_stock = request.args.get('stock', '1') != '0'
+    nearest = shop_index.nearest(lat, lng, k=k, at=at, require_stock=require_stock)
+    shops = _shops_by_id([shop_id for shop_id, _ in nearest])
+    return jsonify(shops=[_shop_json(shops[shop_id], distance) for shop_id, distance in nearest if shop_id in shops])
+
+def _parse_bbox():
+    try:
+        south, west, north, east = (float(v) for v in request.args.get('bbox', '').split(','))
+    except ValueError:
+        abort(400)
+    return south, west, north, east
+
+@bp.route('/shops/within')
+def shops_within():
+    south, west, north, east = _parse_bbox()
+    limit = max(1, min(request.args.get('limit', 200, type=int), 1000))
+    shop_ids = shop_index.within(south, west, north, east)[:limit]
+    shops = _shops_by_id(shop_ids)
+    return jsonify(shops=[_shop_json(shops[shop_id]) for shop_id in shop_ids if shop_id in shops])
+
+def _cached_json(etag, build):
+    # 以 ETag 判斷瀏覽器快取是否仍有效；有效時直接回 304，不必組出資料
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        body = json.dumps(build(), separators=(',', ':'), ensure_ascii=False)
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['API_CACHE_MAX_AGE']
+    return response
+
+SHOP_FIELDS = ['id', 'name', 'address', 'lat', 'lng', 'remaining']
+FOOD_FIELDS = ['id', 'name', 'category', 'quantity', 'photo', 'description', 'expiry']
+
+@bp.route('/shops')
+def shops():
+    bbox = _parse_bbox() if request.args.get('bbox') else None
+    limit = max(1, min(request.args.get('limit', 1000, type=int), 5000))
+    count, max_id, version = shops_fingerprint()
+    raw_etag = f'{count}-{max_id}-{version}-{bbox}-{limit}'
+    etag = 'shops-' + hashlib.sha1(raw_etag.encode()).hexdigest()[:16]
+
+    def build():
+        if bbox:
+            # 其他 worker 新增或刪除商家後 ETag 會變，本行程的索引也要跟著重建，內容才與 ETag 一致
+            shop_index.ensure_loaded(version=(count, max_id))
+            shops = list(_shops_by_id(shop_index.within(*bbox)[:limit]).values())
+        else:
+            shops = shop_listing().limit(limit).all()
+        # 欄位名稱只出現一次，每家商家是一個陣列，縮小傳輸量
+        rows = [[shop.id, shop.name, shop.address, shop.latitude, shop.longitude, shop.available_quantity]
+                for shop in shops]
+        return {'fields': SHOP_FIELDS, 'rows': rows}
+
+    return _cached_json(etag, build)
+
+@bp.route('/shops/<int:shop_id>/foods')
+def shop_foods(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    etag = f'foods-{shop.id}-{shop.stock_version}'
+
+    def build():
+        foods = Food.query.filter_by(shop_id=shop.id, is_active=True).order_by(Food.id).all()
+        rows = [[food.id, food.name, food.category, food.quantity, resolve_photo(food.photo_url), food.description,
+                 food.expiry_time.isoformat() if food.expiry_time else None] for food in foods]
+        return {'shop': shop.id, 'fields': FOOD_FIELDS, 'rows': rows}
+
+    return _cached_json(etag, build)
@@ -0,0 +1,106 @@
+import re
+from flask import current_app, render_template, url_for, flash, session, g
+from flask_login import current_user
+from models import Food
+from i18n import translators, translator_for
+
+PHONE_PATTERN = re.compile(r'^09\d{8}$')
+
+
+# 每個 app 各自的購物車存放與片段快取，由 create_app 放在 app.extensions
+def cart_store():
+    return current_app.extensions['cart_store']
+
+def fragment_cache():
+    return current_app.extensions['fragment_cache']
+
+def user_is(role):
+    return current_user.is_authenticated and current_user.role == role
+
+def shop_required():
+    return current_user.is_authenticated and current_user.role == 'shop'
+
+def languages():
+    return list(translators())
+
+def get_lang():
+    lang = session.get('lang', 'en')
+    if lang not in translators():
+        lang = 'en'
+        session['lang'] = lang
+    return lang
+
+def resolve_translator():
+    # 每個請求只決定一次語言，之後的翻譯都直接查表
+    g.translator = translator_for(get_lang())
+
+def current_translator():
+    translator = g.get('translator')
+    if translator is None:
+        translator = g.translator = translator_for(get_lang())
+    return translator
+
+def translate(key, **kwargs):
+    return current_translator()(key, **kwargs)
+
+def phone_valid(phone):
+    # Allow empty/None; enforce 09xxxxxxxx when provided
+    if not phone:
+        return True
+    return bool(PHONE_PATTERN.match(phone))
+
+def resolve_photo(photo_url):
+    if not photo_url:
+        return url_for('static', filename='img/food-default.svg')
+    if '://' in photo_url:
+        return photo_url
+    cleaned = photo_url.lstrip('/')
+    return url_for('static', filename=cleaned)
+
+def inject_translations():
+    translator = current_translator()
+    return dict(
+        trans=translator,
+        current_lang=translator.lang,
+        languages=languages(),
+        resolve_photo=resolve_photo,
+        shop_card=render_shop_card
+    )
+
+# 商家卡片與食物列表的 HTML 片段依 (商家, 語言, stock_version) 快取
+def render_shop_card(shop):
+    distance = None if shop.distance_km is None else round(shop.distance_km, 1)
+    key = ('shop_card', shop.id, current_translator().lang, shop.stock_version, distance)
+    return fragment_cache().get_or_render(key, lambda: render_template('_shop_card.html', shop=shop))
+
+def render_food_list(shop):
+    key = ('food_list', shop.id, current_translator().lang, shop.stock_version)
+    def render():
+        foods = Food.query.filter_by(shop_id=shop.id, is_active=True).all()
+        return render_template('_food_list.html', foods=foods)
+    return fragment_cache().get_or_render(key, render)
+
+# 購物車存放在伺服器端 (cart_store)，session cookie 只保留登入身分與語言
+def get_cart():
+    cart = cart_store().get(current_user.id)
+    legacy = session.pop('cart', None)
+    if legacy and not cart:
+        cart = legacy
+        cart_store().save(current_user.id, cart)
+    return cart
+
+def save_cart(cart):
+    if cart:
+        cart_store().save(current_user.id, cart)
+    else:
+        clear_cart()
+
+def clear_cart():
+    cart_store().delete(current_user.id)
+
+def flash_removed(counts):
+    flash(translate('flash_rows_removed', orders=counts['orders'], items=counts['order_items'],
+                    foods=counts['foods']), 'secondary')
+
+def import_format(filename):
+    return 'json' if filename.lower().endswith(('.json', '.jsonl')) else 'csv'
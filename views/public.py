@@ -0,0 +1,294 @@
+from datetime import datetime, date
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, abort, g
+from flask_login import login_user, logout_user, current_user, login_required
+from extensions import db
+from models import User, Shop, Food, Order
+from queries import SHOP_SORTS, shop_page, max_remaining_quantity, order_loader_options
+from geo import shop_index
+from inventory import place_order, cancel_orders, ReservationConflict
+from site_stats import adjust_stats
+from identity import identity_cache
+from throttle import login_throttle
+from i18n import translator_for
+from replicas import read_only
+from views.common import (user_is, shop_required, languages, translate, phone_valid, render_food_list,
+                          get_cart, save_cart, clear_cart)
+
+bp = Blueprint('public', __name__)
+
+
+@bp.route('/')
+@read_only
+def index():
+    sort = request.args.get('sort', 'supply')
+    if sort not in SHOP_SORTS:
+        sort = 'supply'
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    shops, next_cursor = shop_page(sort=sort, lat=lat, lng=lng, cursor=request.args.get('cursor'),
+                                   limit=current_app.config['SHOP_PAGE_SIZE'])
+    next_url = None
+    if next_cursor:
+        next_url = url_for('public.index', sort=sort, lat=lat, lng=lng, cursor=next_cursor, partial=1)
+    # 「載入更多」只回傳商家卡片片段
+    if request.args.get('partial'):
+        response = current_app.make_response(render_template('_shop_cards.html', shops=shops))
+        if next_url:
+            response.headers['X-Next-Page'] = next_url
+        return response
+    return render_template('index.html', shops=shops, next_url=next_url, sort=sort,
+                           max_quantity=max_remaining_quantity())
+
+@bp.route('/lang/<lang_code>')
+def switch_language(lang_code):
+    if lang_code not in languages():
+        abort(404)
+    session['lang'] = lang_code
+    g.translator = translator_for(lang_code)
+    flash(translate('flash_lang_switched'), 'info')
+    return redirect(request.referrer or url_for('public.index'))
+
+# --- 認證流程 ---
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        phone = request.form.get('phone')
+        password = request.form.get('password')
+        if not phone_valid(phone):
+            flash(translate('flash_phone_invalid'), 'warning')
+            return redirect(url_for('public.register'))
+        if User.query.filter_by(email=email).first():
+            flash(translate('flash_email_exists'), 'warning')
+            return redirect(url_for('public.register'))
+        user = User(name=name, email=email, phone=phone, role='user')
+        user.set_password(password)
+        db.session.add(user)
+        adjust_stats(total_users=1)
+        db.session.commit()
+        login_user(identity_cache.remember(user))
+        flash(translate('flash_register_success'), 'success')
+        return redirect(url_for('public.index'))
+    return render_template('register.html')
+
+@bp.route('/register/shop', methods=['GET', 'POST'])
+def register_shop():
+    if request.method == 'POST':
+        owner_name = request.form.get('name')
+        email = request.form.get('email')
+        phone = request.form.get('phone')
+        password = request.form.get('password')
+        shop_name = request.form.get('shop_name')
+        address = request.form.get('address')
+        opening_time = request.form.get('opening_time')
+        closing_time = request.form.get('closing_time')
+        latitude = request.form.get('latitude') or None
+        longitude = request.form.get('longitude') or None
+
+        if not phone_valid(phone):
+            flash(translate('flash_phone_invalid'), 'warning')
+            return redirect(url_for('public.register_shop'))
+        if User.query.filter_by(email=email).first():
+            flash(translate('flash_email_exists'), 'warning')
+            return redirect(url_for('public.register_shop'))
+
+        user = User(name=owner_name, email=email, phone=phone, role='shop')
+        user.set_password(password)
+        shop = Shop(
+            name=shop_name,
+            manager_email=email,
+            phone=phone,
+            address=address,
+            opening_time=datetime.strptime(opening_time, '%H:%M').time() if opening_time else None,
+            closing_time=datetime.strptime(closing_time, '%H:%M').time() if closing_time else None,
+            latitude=float(latitude) if latitude else None,
+            longitude=float(longitude) if longitude else None,
+            owner=user
+        )
+        db.session.add(user)
+        db.session.add(shop)
+        adjust_stats(total_shops=1)
+        db.session.commit()
+        shop_index.add_shop(shop)
+        login_user(identity_cache.remember(user))
+        flash(translate('flash_shop_register_success'), 'success')
+        return redirect(url_for('shop.dashboard'))
+    return render_template('register_shop.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        if not login_throttle.allow(request.remote_addr, email):
+            flash(translate('flash_login_throttled'), 'danger')
+            return render_template('login.html'), 429
+        user = User.query.filter_by(email=email).first()
+        if user and user.check_password(password):
+            login_throttle.succeeded(email)
+            if user.password_needs_rehash():
+                # 雜湊設定 (演算法或成本) 已更改：趁有明文密碼時升級
+                user.set_password(password)
+                db.session.commit()
+            login_user(identity_cache.remember(user))
+            flash(translate('flash_login_success'), 'success')
+            next_page = request.args.get('next')
+            return redirect(next_page or url_for('public.index'))
+        flash(translate('flash_login_failed'), 'danger')
+    return render_template('login.html')
+
+@bp.route('/logout')
+def logout():
+    logout_user()
+    flash(translate('flash_logout'), 'info')
+    return redirect(url_for('public.index'))
+
+# --- 民眾端 ---
+@bp.route('/shops/<int:shop_id>')
+@read_only
+def shop_detail(shop_id):
+    shop = Shop.query.get_or_404(shop_id)
+    return render_template('shop_detail.html', shop=shop, food_list=render_food_list(shop))
+
+@bp.route('/cart/add', methods=['POST'])
+@login_required
+def add_to_cart():
+    food_id = int(request.form.get('food_id'))
+    quantity = int(request.form.get('quantity', 1))
+    food = Food.query.get_or_404(food_id)
+    cart = get_cart()
+
+    # 確保購物車僅包含同一商家
+    existing_shop = cart.get('shop_id')
+    if existing_shop and existing_shop != food.shop_id:
+        flash(translate('flash_cart_conflict'), 'warning')
+        return redirect(url_for('public.shop_detail', shop_id=food.shop_id))
+
+    items = cart.get('items', {})
+    current_qty = items.get(str(food_id), 0)
+    items[str(food_id)] = min(food.quantity, current_qty + quantity)
+    cart['items'] = items
+    cart['shop_id'] = food.shop_id
+    save_cart(cart)
+    flash(translate('flash_item_added', name=food.name), 'success')
+    return redirect(url_for('public.shop_detail', shop_id=food.shop_id))
+
+@bp.route('/cart/remove/<int:food_id>', methods=['POST'])
+@login_required
+def remove_from_cart(food_id):
+    cart = get_cart()
+    items = cart.get('items', {})
+    if str(food_id) in items:
+        items.pop(str(food_id))
+    cart['items'] = items
+    if not items:
+        cart.clear()
+    save_cart(cart)
+    flash(translate('flash_item_removed'), 'info')
+    return redirect(url_for('public.checkout'))
+
+@bp.route('/checkout', methods=['GET', 'POST'])
+@login_required
+def checkout():
+    cart = get_cart()
+    items = cart.get('items', {})
+    if not items:
+        flash(translate('flash_cart_empty'), 'info')
+        return redirect(url_for('public.index'))
+
+    foods = Food.query.filter(Food.id.in_(map(int, items.keys()))).all()
+    food_map = {food.id: food for food in foods}
+    shop = Shop.query.get(cart.get('shop_id'))
+
+    if request.method == 'POST':
+        pickup_time_str = request.form.get('pickup_time')
+        if not pickup_time_str:
+            flash(translate('flash_select_pickup'), 'warning')
+            return redirect(url_for('public.checkout'))
+
+        pickup_dt = datetime.combine(date.today(), datetime.strptime(pickup_time_str, '%H:%M').time())
+        now = datetime.now()
+        if pickup_dt <= now:
+            flash(translate('flash_pickup_future'), 'warning')
+            return redirect(url_for('public.checkout'))
+        if shop and shop.closing_time and pickup_dt.time() > shop.closing_time:
+            flash(translate('flash_pickup_hours'), 'warning')
+            return redirect(url_for('public.checkout'))
+
+        try:
+            order, fills = place_order(current_user.id, shop.id, pickup_dt, items)
+        except ReservationConflict:
+            flash(translate('flash_checkout_busy'), 'warning')
+            return redirect(url_for('public.checkout'))
+        if order is None:
+            clear_cart()
+            flash(translate('flash_items_sold_out'), 'warning')
+            return redirect(url_for('public.shop_detail', shop_id=shop.id))
+        clear_cart()
+        # 部分品項被其他人先訂走時，告知實際預約到的數量
+        for fill in fills:
+            if fill.booked < fill.requested and fill.food_id in food_map:
+                flash(translate('flash_partial_fill', name=food_map[fill.food_id].name,
+                                booked=fill.booked, requested=fill.requested), 'warning')
+        flash(translate('flash_booking_success'), 'success')
+        return redirect(url_for('public.order_success', order_id=order.id))
+
+    return render_template('checkout.html', items=items, foods=food_map, shop=shop)
+
+@bp.route('/orders/success/<int:order_id>')
+@login_required
+def order_success(order_id):
+    order = Order.query.get_or_404(order_id)
+    if order.user_id != current_user.id and not user_is('admin'):
+        flash(translate('flash_forbidden_order'), 'danger')
+        return redirect(url_for('public.index'))
+    return render_template('order_success.html', order=order)
+
+@bp.route('/orders')
+@login_required
+@read_only
+def orders():
+    all_orders = (
+        Order.query.options(*order_loader_options())
+        .filter_by(user_id=current_user.id)
+        .order_by(Order.created_at.desc())
+        .all()
+    )
+    return render_template('orders.html', orders=all_orders)
+
+@bp.route('/orders/<int:order_id>/cancel', methods=['POST'])
+@login_required
+def cancel_order(order_id):
+    order = Order.query.get_or_404(order_id)
+    user_is_order_owner = order.user_id == current_user.id
+    user_is_shop_owner = shop_required() and current_user.shop_id == order.shop_id
+    if not (user_is_order_owner or user_is_shop_owner or user_is('admin')):
+        abort(403)
+    if order.status == 'completed':
+        flash(translate('flash_order_completed'), 'warning')
+        return redirect(request.referrer or url_for('public.orders'))
+    cancel_orders([order.id])
+    db.session.commit()
+    flash(translate('flash_order_cancelled'), 'info')
+    return redirect(request.referrer or url_for('public.orders'))
+
+@bp.route('/account', methods=['GET', 'POST'])
+@login_required
+def account():
+    user = current_user.load_row()
+    if request.method == 'POST':
+        user.name = request.form.get('name')
+        phone = request.form.get('phone')
+        if not phone_valid(phone):
+            flash(translate('flash_phone_invalid'), 'warning')
+            return redirect(url_for('public.account'))
+        user.phone = phone
+        new_password = request.form.get('new_password')
+        if new_password:
+            user.set_password(new_password)
+        db.session.commit()
+        identity_cache.invalidate(user.id)
+        flash(translate('flash_profile_updated'), 'success')
+        return redirect(url_for('public.account'))
+    return render_template('account.html', user=user)
@@ -0,0 +1,186 @@
+import csv
+from datetime import datetime, date, timedelta
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, abort, jsonify, \
+    stream_with_context
+from flask_login import current_user, login_required
+from extensions import db
+from models import Shop, Food, Order
+from queries import order_queue, ORDER_STATUSES, ORDER_WINDOWS
+from inventory import bump_stock_version, cancel_orders, cancel_no_shows
+from analytics import shop_analytics, forget_days, MAX_DAYS
+from food_io import iter_records, import_foods, inventory_csv, order_history_csv
+from views.common import shop_required, translate, import_format
+
+bp = Blueprint('shop', __name__, url_prefix='/shop')
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    if not shop_required():
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    shop = db.session.get(Shop, current_user.shop_id) if current_user.shop_id else None
+    # 預設顯示今天待取貨的訂單，依取貨時間排序
+    status = request.args.get('status', 'pending')
+    if status not in ORDER_STATUSES:
+        status = 'all'
+    window = request.args.get('window', 'today')
+    if window not in ORDER_WINDOWS:
+        window = 'today'
+    foods, orders, next_url = [], [], None
+    if shop:
+        foods = shop.foods.order_by(Food.created_at.desc()).all()
+        orders, next_cursor = order_queue(shop.id, status, window, request.args.get('cursor'),
+                                          limit=current_app.config['ORDER_PAGE_SIZE'])
+        if next_cursor:
+            next_url = url_for('shop.dashboard', status=status, window=window, cursor=next_cursor)
+    return render_template('shop_dashboard.html', shop=shop, foods=foods, orders=orders,
+                           status=status, window=window, next_url=next_url)
+
+@bp.route('/foods/new', methods=['GET', 'POST'])
+@login_required
+def new_food():
+    if not shop_required():
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    if request.method == 'POST':
+        food = Food(
+            shop_id=current_user.shop_id,
+            name=request.form.get('name'),
+            category=request.form.get('category'),
+            quantity=int(request.form.get('quantity') or 0),
+            expiry_time=datetime.strptime(request.form.get('expiry_time'), '%Y-%m-%d') if request.form.get('expiry_time') else None,
+            photo_url=request.form.get('photo_url'),
+            description=request.form.get('description'),
+            is_active=True
+        )
+        db.session.add(food)
+        bump_stock_version(current_user.shop_id)
+        db.session.commit()
+        flash(translate('flash_food_created'), 'success')
+        return redirect(url_for('shop.dashboard'))
+    return render_template('food_form.html', action='create')
+
+@bp.route('/foods/import', methods=['POST'], endpoint='import_foods')
+@login_required
+def import_food_file():
+    if not shop_required() or not current_user.shop_id:
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash(translate('flash_import_no_file'), 'warning')
+        return redirect(url_for('shop.dashboard'))
+    try:
+        result = import_foods(current_user.shop_id, iter_records(upload.stream, import_format(upload.filename)),
+                              chunk_size=current_app.config['FOOD_IMPORT_CHUNK'])
+    except (ValueError, csv.Error):
+        # 檔案本身無法解析 (編碼錯誤、JSON 陣列格式錯誤…)：整批不寫入
+        db.session.rollback()
+        flash(translate('flash_import_failed'), 'danger')
+        return redirect(url_for('shop.dashboard'))
+    db.session.commit()
+    flash(translate('flash_import_done', created=result.created, updated=result.updated, skipped=result.skipped),
+          'success' if not result.skipped else 'warning')
+    for line, code in result.errors[:5]:
+        flash(translate('flash_import_error', line=line, reason=translate('import_error_' + code)), 'warning')
+    return redirect(url_for('shop.dashboard'))
+
+def _csv_download(lines, filename):
+    response = current_app.response_class(stream_with_context(lines), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+@bp.route('/foods/export.csv')
+@login_required
+def export_inventory():
+    if not shop_required() or not current_user.shop_id:
+        abort(403)
+    return _csv_download(inventory_csv(current_user.shop_id), f'inventory-{current_user.shop_id}.csv')
+
+@bp.route('/orders/export.csv')
+@login_required
+def export_order_history():
+    if not shop_required() or not current_user.shop_id:
+        abort(403)
+    return _csv_download(order_history_csv(current_user.shop_id), f'orders-{current_user.shop_id}.csv')
+
+@bp.route('/foods/<int:food_id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_food(food_id):
+    if not shop_required():
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    food = Food.query.get_or_404(food_id)
+    if request.method == 'POST':
+        food.name = request.form.get('name')
+        food.category = request.form.get('category')
+        food.quantity = int(request.form.get('quantity') or 0)
+        food.expiry_time = datetime.strptime(request.form.get('expiry_time'), '%Y-%m-%d') if request.form.get('expiry_time') else None
+        food.photo_url = request.form.get('photo_url')
+        food.description = request.form.get('description')
+        food.is_active = request.form.get('is_active') == 'true'
+        bump_stock_version(food.shop_id)
+        db.session.commit()
+        flash(translate('flash_food_updated'), 'success')
+        return redirect(url_for('shop.dashboard'))
+    return render_template('food_form.html', action='edit', food=food)
+
+@bp.route('/foods/<int:food_id>/delete', methods=['POST'])
+@login_required
+def delete_food(food_id):
+    if not shop_required():
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    food = Food.query.get_or_404(food_id)
+    db.session.delete(food)
+    bump_stock_version(food.shop_id)
+    db.session.commit()
+    flash(translate('flash_food_deleted'), 'info')
+    return redirect(url_for('shop.dashboard'))
+
+@bp.route('/orders/<int:order_id>/status', methods=['POST'])
+@login_required
+def update_order_status(order_id):
+    if not shop_required():
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    order = Order.query.get_or_404(order_id)
+    status = request.form.get('status')
+    if status not in ['pending', 'completed', 'cancelled']:
+        flash(translate('flash_invalid_status'), 'warning')
+        return redirect(url_for('shop.dashboard'))
+    if order.status == 'cancelled' and status != 'cancelled':
+        flash(translate('flash_cannot_update_cancelled'), 'warning')
+        return redirect(url_for('shop.dashboard'))
+    if status == 'cancelled':
+        # 取消與補回庫存交給 cancel_orders，已完成的訂單也可由商家取消
+        cancel_orders([order.id], include_completed=True)
+    else:
+        order.status = status
+        order.completed_at = datetime.utcnow() if status == 'completed' else None
+        forget_days([(order.shop_id, order.pickup_time)])
+    db.session.commit()
+    flash(translate('flash_status_updated'), 'success')
+    return redirect(request.referrer or url_for('shop.dashboard'))
+
+@bp.route('/analytics')
+@login_required
+def analytics():
+    if not shop_required() or not current_user.shop_id:
+        abort(403)
+    days = min(max(request.args.get('days', 30, type=int), 1), MAX_DAYS)
+    end = date.today() + timedelta(days=1)
+    return jsonify(shop_analytics(current_user.shop_id, end - timedelta(days=days), end))
+
+@bp.route('/orders/cancel-no-shows', methods=['POST'], endpoint='cancel_no_shows')
+@login_required
+def cancel_shop_no_shows():
+    if not shop_required() or not current_user.shop_id:
+        flash(translate('flash_shop_only'), 'danger')
+        return redirect(url_for('public.index'))
+    cancelled = cancel_no_shows(current_user.shop_id)
+    db.session.commit()
+    flash(translate('flash_no_shows_cancelled', count=len(cancelled)), 'info')
+    return redirect(url_for('shop.dashboard'))
@@ -0,0 +1,4 @@
+# WSGI 進入點：gunicorn -c gunicorn.conf.py (其他 WSGI 伺服器指向 wsgi:app 即可)
+from app import create_app
+
+app = create_app()